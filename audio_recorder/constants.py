@@ -1,4 +1,5 @@
 # constants.py - Arquivo central para configurações compartilhadas
+import os
 import pyaudio
 
 # Configurações de áudio
@@ -13,15 +14,65 @@ WHISPER_MODEL = "base"     # Modelo do Whisper (tiny, base, small, medium, large
                            # "tiny" (39M) ou "base" (74M) consomem muito menos recursos que "medium" (769M)
 SEGMENT_LENGTH = 5         # Tamanho do segmento de áudio em segundos (reduzido)
 HOP_LENGTH = 2.5           # Tempo entre processamentos consecutivos (reduzido)
+RECORDING_GROUP_SECONDS = 30  # Trechos de fala consecutivos são agrupados até esta duração (janela nativa do Whisper)
+RECORDING_BATCH_SIZE = 1   # Segmentos da gravação transcritos juntos em uma passada do modelo (1 = um por vez, com beam search e contexto encadeado;
+                           # lotes maiores decodificam de forma gulosa e sem o contexto do segmento anterior)
 
 # Configurações de sistema de arquivos
 TEMP_DIR = "temp"          # Diretório para arquivos temporários
 DEFAULT_OUTPUT_WAV = f"{TEMP_DIR}/recording.wav"  # Nome padrão do arquivo de saída
 
 # Configurações do modelo Whisper
-DEVICE_TYPE = "cpu"        # Dispositivo para processamento ("cpu" ou "cuda" para GPU)
+DEVICE_TYPE = "auto"       # Dispositivo para processamento ("auto" usa "cuda" se disponível, senão "cpu")
 TEMPERATURE = 0.0          # Temperatura para aleatoriedade na geração de texto (0.0 = determinístico)
+TEMPERATURE_FALLBACK = (0.2, 0.4, 0.6, 0.8)  # Temperaturas das novas tentativas quando a decodificação de um clipe falha (repetição ou baixa confiança)
+MAX_TOKENS_PER_SECOND = 8  # Limite de tokens gerados por segundo de áudio nas janelas do streaming (fala rápida ~5-6)
+# Backend de transcrição ("whisper", "faster-whisper", "openvino" ou "whisper.cpp"); pode ser trocado pela variável de ambiente.
+# O openai-whisper (requirements.txt) é o padrão, com o streaming incremental e os caches próprios dele;
+# o faster-whisper (int8) é opcional: instale-o e use TRANSCRIBER_BACKEND=faster-whisper
+TRANSCRIBER_BACKEND = os.environ.get("TRANSCRIBER_BACKEND", "whisper")
+INFERENCE_PROCESS = True   # Executa o modelo em um processo separado, sem disputar o GIL com a interface
+# Servidor de inferência compartilhado (python src/inference_process.py): socket Unix ou, no Windows, r"\\.\pipe\nome".
+# Se definido e ativo, os processos do programa usam o modelo já carregado nele em vez de iniciar um processo próprio
+INFERENCE_SERVER_ADDRESS = os.environ.get("INFERENCE_SERVER_ADDRESS")
+# Chave secreta das conexões com o servidor (obrigatória, sem valor padrão): quem a conhece pode executar
+# pedidos no servidor, que desserializa (pickle) o que recebe. Gere uma com: python -c "import secrets; print(secrets.token_hex(32))"
+INFERENCE_SERVER_AUTHKEY = os.environ.get("INFERENCE_SERVER_AUTHKEY", "").encode()
+OPTIMIZE_WEIGHTS = True    # Pesos em FP16 na GPU; na CPU, MLPs do decoder em int8 e encoder em BF16 (se suportado)
+TORCH_COMPILE = False      # Compila o encoder do Whisper com torch.compile na inicialização (requer torch>=2.0)
+TORCH_CPU_THREADS = 0      # Threads do PyTorch na CPU (0 = um por núcleo físico)
+
+# Configurações do backend faster-whisper (CTranslate2)
+FASTER_WHISPER_COMPUTE_TYPE = None  # Tipo de computação; None usa "int8_float16" na GPU e "int8" na CPU
+FASTER_WHISPER_VAD_FILTER = True    # Remove trechos sem fala com o VAD do faster-whisper antes de decodificar
+FASTER_WHISPER_NUM_WORKERS = 2      # Trechos de um lote transcritos em paralelo pelo mesmo modelo (threads)
+
+# Configurações do backend OpenVINO
+OPENVINO_MODEL_DIR = "models/whisper-base-ov"  # Modelo exportado com optimum-cli export openvino
+OPENVINO_MODEL_ID = f"openai/whisper-{WHISPER_MODEL}"  # Modelo exportado automaticamente se OPENVINO_MODEL_DIR não existir
+OPENVINO_WEIGHT_FORMAT = "int8"  # Pesos quantizados na exportação automática ("int8", "int4" ou "fp16")
+OPENVINO_DEVICE = "CPU"    # Dispositivo OpenVINO ("CPU", "GPU" ou "NPU")
+OPENVINO_CACHE_DIR = "ov_cache"  # Cache do modelo compilado, reutilizado entre execuções
+
+# Configurações do backend whisper.cpp (pywhispercpp)
+WHISPER_CPP_MODEL = f"{WHISPER_MODEL}-q8_0"  # Modelo GGML quantizado em 8 bits (ex.: "base-q5_1" para 5 bits)
+WHISPER_CPP_THREADS = 0    # Threads de inferência (0 = um por núcleo físico)
 
 # Configurações de otimização de desempenho
 LIMIT_HISTORY = True       # Limitar histórico para economizar memória
-MAX_HISTORY_SECONDS = 10   # Máximo de segundos de áudio a manter no histórico 
\ No newline at end of file
+MAX_HISTORY_SECONDS = 10   # Máximo de segundos de áudio a manter no histórico 
+TRANSCRIBE_CACHE_SIZE = 64 # Número de transcrições recentes mantidas em cache (por hash do áudio)
+PREPARED_AUDIO_CACHE_SIZE = 2 # Gravações recentes cujo áudio convertido e períodos de fala ficam em cache
+ENCODER_CACHE_SIZE = 4     # Saídas do encoder do Whisper mantidas em cache (por hash do mel)
+PROMPT_TOKEN_CACHE_SIZE = 256  # Prompts (contexto) já tokenizados mantidos em cache
+PROMPT_CONTEXT_CHARS = 600 # Caracteres finais do segmento anterior usados como contexto (~200 tokens, o limite do prompt do Whisper)
+REALTIME_MAX_BATCH = 4     # Máximo de chunks pendentes transcritos em uma única chamada ao modelo
+UI_FLUSH_INTERVAL_MS = 100 # Intervalo (ms) em que as transcrições parciais são agrupadas antes de atualizar a interface
+LIVE_POLL_INTERVAL_MS = 50 # Intervalo (ms) em que a interface verifica se há um novo hop de áudio para transcrever
+SILENCE_RMS_THRESHOLD = 200  # RMS (em unidades int16) abaixo do qual um chunk é tratado como silêncio
+RING_MEMMAP_MIN_BYTES = 16 * 1024 * 1024  # Buffers de gravação maiores que isso usam um arquivo mapeado em memória
+BUFFER_POOL_SIZE = 4       # Buffers pré-alocados por tipo (int16/float32) para os chunks em tempo real
+
+# Valores derivados, calculados uma única vez na importação
+SEGMENT_SAMPLES = int(SEGMENT_LENGTH * SAMPLE_RATE)  # Amostras em um segmento do modo ao vivo
+HOP_SAMPLES = int(HOP_LENGTH * SAMPLE_RATE)          # Amostras entre segmentos consecutivos
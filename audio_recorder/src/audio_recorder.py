@@ -1,12 +1,15 @@
 import pyaudio
 import threading
-import collections
 import sys
 import os
 import time
 import wave
 import numpy as np
 import logging
+import queue
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Adiciona o diretório raiz ao caminho de busca para importar constants
@@ -16,36 +19,83 @@ from constants import (
     SAMPLE_RATE, 
     CHUNK_SIZE, 
     CHANNELS, 
-    SAMPLE_FORMAT
+    SAMPLE_FORMAT,
+    REALTIME_MAX_BATCH,
+    SILENCE_RMS_THRESHOLD,
+    BUFFER_POOL_SIZE,
+    RING_MEMMAP_MIN_BYTES
 )
 
-from transcription_base import transcribe_audio, save_frames_to_wav
+from transcription_base import transcribe_audio, transcribe_audio_batch, save_frames_to_wav, int16_to_float32
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("audio_recorder")
 
-class AudioRecorder:
-    def __init__(self, window_seconds=WINDOW_SECONDS, output_dir="recordings"):
-        # Inicializa a interface PyAudio
-        p = pyaudio.PyAudio()
-        
+@functools.lru_cache(maxsize=1)
+def _find_input_device_index():
+    """
+    Procura o dispositivo de entrada a usar, uma única vez por processo.
+    
+    A enumeração de dispositivos do PortAudio consulta o serviço de áudio do sistema
+    e pode levar dezenas de ms; a lista quase nunca muda, então o resultado fica em cache.
+    Use refresh_input_devices() após conectar ou remover um dispositivo.
+    """
+    p = pyaudio.PyAudio()
+    try:
         # Tenta encontrar o dispositivo de cabo virtual (VB-Cable)
         # Um cabo virtual permite capturar o áudio do sistema em vez do microfone
-        device_index = None
         for i in range(p.get_device_count()):
             info = p.get_device_info_by_index(i)
             # Procura dispositivos com 'cable' no nome (como VB-Cable)
             if info['maxInputChannels'] > 0 and 'cable' in info['name'].lower():
-                device_index = i
-                break
+                return i
                 
         # Se não encontrar cabo virtual, usa o dispositivo de entrada padrão
-        if device_index is None:
-            device_index = p.get_default_input_device_info()['index']
+        return p.get_default_input_device_info()['index']
+    finally:
+        p.terminate()
+
+def refresh_input_devices():
+    """Descarta o dispositivo de entrada em cache; a próxima gravação o procura novamente."""
+    _find_input_device_index.cache_clear()
+
+class BufferPool:
+    """
+    Conjunto de buffers numpy pré-alocados, emprestados e devolvidos sem novas alocações.
+    
+    Se todos os buffers estiverem em uso, acquire() aloca um avulso em vez de bloquear;
+    ele volta ao conjunto na devolução enquanto houver espaço.
+    """
+    
+    def __init__(self, count, size, dtype):
+        self.count = count
+        self.size = size
+        self.dtype = np.dtype(dtype)
+        self._free = queue.SimpleQueue()
+        for _ in range(count):
+            self._free.put(np.empty(size, dtype=self.dtype))
             
+    def acquire(self):
+        """Empresta um buffer com self.size elementos."""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return np.empty(self.size, dtype=self.dtype)
+            
+    def release(self, buffer):
+        """Devolve um buffer (ou uma fatia dele) obtido com acquire()."""
+        base = buffer if buffer.base is None else buffer.base
+        if base.shape == (self.size,) and base.dtype == self.dtype and self._free.qsize() < self.count:
+            self._free.put(base)
+
+class AudioRecorder:
+    def __init__(self, window_seconds=WINDOW_SECONDS, output_dir="recordings"):
+        # Inicializa a interface PyAudio
+        p = pyaudio.PyAudio()
+        
         # Configuração dos parâmetros de gravação
-        self.input_device_index = device_index  # Índice do dispositivo a usar
+        self.input_device_index = _find_input_device_index()  # Índice do dispositivo a usar (em cache)
         self.audio = p  # Objeto PyAudio
         self.recording = False  # Estado da gravação
         self.rate = SAMPLE_RATE  # Taxa de amostragem
@@ -55,28 +105,67 @@ class AudioRecorder:
         
         # Calcula quantos chunks cabem na janela de tempo desejada
         self.max_chunks = int((self.rate * window_seconds) / self.chunk)
-        # Usa deque como buffer circular com tamanho máximo
-        self.frames = collections.deque(maxlen=self.max_chunks)
+        self.window_samples = self.max_chunks * self.chunk * self.channels
         
-        # Lock para acesso seguro ao buffer em operações de leitura
-        self.buffer_lock = threading.Lock()
+        # Buffer circular pré-alocado, escrito apenas pelo callback do PortAudio (produtor único).
+        # O tamanho é a próxima potência de dois acima da janela: a posição vira uma máscara
+        # de bits e a folga evita que a janela lida seja sobrescrita durante a cópia
+        ring_size = 1 << self.window_samples.bit_length()
+        self.ring = self._allocate_ring(ring_size)
+        self._ring_mask = ring_size - 1
+        
+        # Total de amostras recebidas desde o início da gravação. Só o callback escreve;
+        # os consumidores apenas leem (atribuição de inteiro é atômica sob o GIL)
+        self.total_written = 0
+        
+        # Sinaliza à thread de despacho que o callback escreveu novos dados
+        self._data_ready = threading.Event()
         
         # Variáveis para transcrição em tempo real
         self.realtime_transcription = False
         self.chunk_duration = 2.0  # Em segundos
-        self.chunk_frames = []
+        self.max_chunk_size = 3 * self.rate  # Máximo de 3 segundos por chunk
+        self.chunk_start = 0  # Posição absoluta (em amostras) do início do chunk atual
         self.transcription_callback = None
         self.last_chunk_time = 0
         
+        # Chunks aguardando transcrição: se o modelo ficar para trás, os pendentes
+        # são transcritos juntos em um único lote
+        self._pending_chunks = []
+        self._pending_lock = threading.Lock()
+        self._pending_worker_active = False
+        
+        # Buffers reutilizados pelos chunks em tempo real: nada é alocado por chunk
+        self._int16_pool = BufferPool(BUFFER_POOL_SIZE, self.max_chunk_size, np.int16)
+        self._float_pool = BufferPool(BUFFER_POOL_SIZE, self.max_chunk_size, np.float32)
+        
         # Função de processamento para cada chunk coletado
         self.chunk_processor = None
         
+        # Threads reutilizadas para transcrição e processador de chunks (criadas ao gravar)
+        self._executor = None
+        self._processor_future = None
+        
         # Diretório de saída para arquivos gravados
         self.output_dir = output_dir
         
         # Cria o diretório de saída se não existir
         os.makedirs(self.output_dir, exist_ok=True)
 
+    @staticmethod
+    def _allocate_ring(ring_size):
+        """
+        Aloca o buffer circular int16.
+        
+        Janelas longas (acima de RING_MEMMAP_MIN_BYTES) ficam em um arquivo temporário
+        mapeado em memória: o sistema pode paginar o áudio antigo para o disco em vez
+        de mantê-lo todo residente. O arquivo é removido automaticamente ao ser fechado.
+        """
+        if ring_size * np.dtype(np.int16).itemsize < RING_MEMMAP_MIN_BYTES:
+            return np.zeros(ring_size, dtype=np.int16)
+        arena = tempfile.TemporaryFile()
+        return np.memmap(arena, dtype=np.int16, mode='w+', shape=(ring_size,))
+
     def start_recording(self):
         # Evita iniciar múltiplas gravações
         if self.recording:
@@ -84,142 +173,277 @@ class AudioRecorder:
             return
             
         # Limpa o buffer e marca como gravando
-        with self.buffer_lock:
-            self.frames.clear()
+        self.total_written = 0
+        self._data_ready.clear()
         self.recording = True
         
         # Inicializa ou reinicializa PyAudio
         self.audio = pyaudio.PyAudio()
         
-        # Abre o stream de áudio
+        self.chunk_start = 0
+        self.last_chunk_time = time.time()
+        
+        # Pool fixo de threads: evita criar uma thread nova a cada chunk
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="AudioRecorder")
+        self._processor_future = None
+        
+        # Inicia thread de despacho (transcrição em tempo real e processador de chunks)
+        self.thread = threading.Thread(target=self._record_thread, daemon=True)
+        self.thread.start()
+        
+        # Abre o stream de áudio em modo callback: o PortAudio entrega cada bloco
+        # diretamente ao _audio_callback, sem um loop Python bloqueado em stream.read
         self.stream = self.audio.open(
             format=self.fmt,
             channels=self.channels,
             rate=self.rate,
             input=True,
             input_device_index=self.input_device_index,
-            frames_per_buffer=self.chunk
+            frames_per_buffer=self.chunk,
+            stream_callback=self._audio_callback
         )
+        self.stream.start_stream()
         
-        self.chunk_frames = []
-        self.last_chunk_time = time.time()
+        logger.info("Gravação iniciada")
+
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        """
+        Callback chamado pelo PortAudio a cada bloco capturado.
+        Apenas copia as amostras para o buffer circular e publica a nova posição.
+        """
+        if not self.recording:
+            return None, pyaudio.paComplete
+            
+        if status:
+            logger.debug(f"Status do stream de áudio: {status}")
+            
+        # Visão somente leitura dos bytes entregues pelo PortAudio: a única cópia
+        # é a escrita abaixo, direto no buffer circular
+        samples = np.frombuffer(in_data, dtype=np.int16, count=frame_count * self.channels)
+        size = len(self.ring)
+        if len(samples) > size:
+            samples = samples[-size:]
+        n = len(samples)
+        total = self.total_written
         
-        # Inicia thread para gravação em background
-        self.thread = threading.Thread(target=self._record_thread, daemon=True)
-        self.thread.start()
+        # Escreve no buffer circular com no máximo duas atribuições de fatia
+        w = total & self._ring_mask
+        end = w + n
+        if end <= size:
+            np.copyto(self.ring[w:end], samples)
+        else:
+            first = size - w
+            np.copyto(self.ring[w:], samples[:first])
+            np.copyto(self.ring[:n - first], samples[first:])
+            
+        # Publica a nova posição somente depois de escrever as amostras
+        self.total_written = total + n
+            
+        self._data_ready.set()
+        return None, pyaudio.paContinue
+
+    def _read_range(self, start, end, copy=True, out=None):
+        """
+        Lê as amostras entre as posições absolutas [start, end) do buffer circular.
         
-        logger.info("Gravação iniciada")
+        As posições são contadas desde o início da gravação (ver total_written).
+        Amostras que já foram sobrescritas são descartadas automaticamente.
+        
+        Args:
+            start: Posição absoluta inicial
+            end: Posição absoluta final (exclusiva)
+            copy: Se False, retorna uma visão do buffer quando os dados são contíguos
+            out: Array int16 opcional que recebe as amostras (retorna uma fatia dele)
+            
+        Returns:
+            np.ndarray: Array int16 contíguo, da amostra mais antiga para a mais recente
+        """
+        size = len(self.ring)
+        start = max(start, end - self.window_samples, 0)
+        n_samples = end - start
+        if n_samples <= 0:
+            return np.zeros(0, dtype=np.int16)
+            
+        first = start & self._ring_mask
+        last = first + n_samples
+        if out is not None:
+            out = out[:n_samples]
+            if last <= size:
+                out[:] = self.ring[first:last]
+            else:
+                np.concatenate((self.ring[first:], self.ring[:last - size]), out=out)
+            return out
+        if last <= size:
+            view = self.ring[first:last]
+            return view.copy() if copy else view
+        # Dados atravessam o fim do buffer: junta as duas fatias em uma única cópia
+        return np.concatenate((self.ring[first:], self.ring[:last - size]))
+
+    def _read_last(self, n_samples, copy=True):
+        """Retorna as últimas n_samples amostras gravadas (ver _read_range)."""
+        total = self.total_written
+        return self._read_range(total - n_samples, total, copy)
 
     def _record_thread(self):
-        """Função executada em thread para gravação contínua."""
+        """
+        Thread de despacho executada durante a gravação.
+        A captura é feita pelo _audio_callback; aqui apenas reagimos aos novos
+        blocos para a transcrição em tempo real e o processador de chunks.
+        """
         try:
             # Contador para limitar a frequência de processamento em paralelo
             frame_counter = 0
             
-            # Tempo da última limpeza de memória
-            last_cleanup_time = time.time()
+            # Total de amostras já despachadas
+            dispatched = 0
             
             while self.recording:
-                # Lê dados do stream
-                try:
-                    data = self.stream.read(self.chunk, exception_on_overflow=False)
-                except OSError as e:
-                    # Erro comum quando o dispositivo de áudio é alterado ou desconectado
-                    logger.error(f"Erro ao ler do stream de áudio: {e}")
-                    time.sleep(0.1)  # Pausa breve para evitar loop de erro intensivo
+                # Aguarda o callback sinalizar novos dados
+                if not self._data_ready.wait(timeout=0.5):
                     continue
+                self._data_ready.clear()
                 
-                # Converte para array numpy para processamento
-                frame_data = np.frombuffer(data, dtype=np.int16)
-                
-                # Adiciona ao buffer de frames
-                with self.buffer_lock:
-                    self.frames.append(frame_data)
+                total = self.total_written
+                new_samples = total - dispatched
+                if new_samples <= 0:
+                    continue
+                dispatched = total
                 
-                # Adiciona ao buffer de chunks somente se transcrição em tempo real estiver ativa
+                # Verifica chunks somente se transcrição em tempo real estiver ativa
                 if self.realtime_transcription:
-                    self.chunk_frames.append(frame_data)
-                    
                     # Verifica se é hora de processar um chunk
                     current_time = time.time()
                     chunk_time = current_time - self.last_chunk_time
                     
                     if chunk_time >= self.chunk_duration:
-                        self._process_audio_chunk()
+                        self._process_audio_chunk(total)
                         self.last_chunk_time = current_time
                 
                 # Processador de chunks personalizado - executa com menos frequência
                 if self.chunk_processor and frame_counter % 5 == 0:  # A cada 5 frames ao invés de cada frame
-                    # Evita criar cópias desnecessárias que desperdiçam memória
-                    with self.buffer_lock:
-                        # Usa uma referência direta ao invés de fazer uma cópia completa
-                        # Os frames individuais não serão modificados, então é seguro
-                        frames_ref = list(self.frames)
+                    # Obtém uma cópia dos frames atuais do buffer circular
+                    frames_ref = self.get_frames()
                     
-                    # Limita a criação de novas threads - executa diretamente a cada 10 ciclos
+                    # Executa diretamente a cada 10 ciclos
                     if frame_counter % 10 == 0:
                         self.chunk_processor(frames_ref, False)
-                    else:
-                        # Usa thread somente de vez em quando para manter responsividade
-                        threading.Thread(
-                            target=self.chunk_processor,
-                            args=(frames_ref, False),
-                            daemon=True
-                        ).start()
+                    elif self._processor_future is None or self._processor_future.done():
+                        # Nos demais, usa o pool para manter responsividade; se a execução
+                        # anterior ainda não terminou, pula esta em vez de enfileirar
+                        self._processor_future = self._executor.submit(self.chunk_processor, frames_ref, False)
                 
                 # Incrementa o contador de frames
                 frame_counter += 1
-                
-                # A cada 60 segundos, verifica se é necessário limpar recursos
-                current_time = time.time()
-                if current_time - last_cleanup_time > 60:
-                    # Força liberação de memória não utilizada
-                    import gc
-                    gc.collect()
-                    last_cleanup_time = current_time
                         
         except Exception as e:
             logger.error(f"Erro durante gravação: {e}")
             self.recording = False
 
-    def _process_audio_chunk(self):
-        """Processa um chunk de áudio para transcrição em tempo real."""
-        if not self.chunk_frames or not self.transcription_callback:
+    def _process_audio_chunk(self, end):
+        """
+        Processa um chunk de áudio para transcrição em tempo real.
+        
+        Args:
+            end: Posição absoluta (em amostras) do fim do chunk no buffer circular
+        """
+        if not self.transcription_callback:
             return
             
         # Verifica se o buffer é grande o suficiente para processar
-        if len(self.chunk_frames) < 5:  # Evita processar buffers muito pequenos
+        # Evita processar buffers muito pequenos (menos de 5 chunks)
+        if end - self.chunk_start < 5 * self.chunk:
             return
             
-        # Concatena frames do chunk em um único array
-        chunk_data = np.concatenate(self.chunk_frames)
-        self.chunk_frames = []  # Limpa o buffer do chunk
-        
         # Limita o tamanho do chunk para evitar uso excessivo de memória
-        max_chunk_size = 3 * 16000  # Máximo 3 segundos a 16kHz
-        if len(chunk_data) > max_chunk_size:
-            chunk_data = chunk_data[-max_chunk_size:]
-        
-        # Envia para transcrição em uma thread separada para não bloquear a gravação
-        # Reutiliza o mesmo thread quando possível para não criar threads excessivos
-        threading.Thread(
-            target=self._transcribe_chunk, 
-            args=(chunk_data,),  # Não faz cópia, usa diretamente o array
-            daemon=True
-        ).start()
+        start = max(self.chunk_start, end - self.max_chunk_size)
+        self.chunk_start = end  # O próximo chunk começa onde este termina
+        
+        # Copia o trecho do buffer circular em um buffer emprestado do pool
+        chunk_data = self._read_range(start, end, out=self._int16_pool.acquire())
+        
+        # Pula chunks de silêncio: não há o que transcrever e cada chamada ao Whisper custa caro
+        if self._is_silence(chunk_data):
+            self._int16_pool.release(chunk_data)
+            return
+        
+        # Enfileira para transcrição; uma única thread esvazia a fila para não
+        # bloquear a gravação nem criar threads excessivos
+        with self._pending_lock:
+            self._pending_chunks.append(chunk_data)
+            if self._pending_worker_active:
+                return
+            self._pending_worker_active = True
+            
+        try:
+            self._executor.submit(self._drain_pending_chunks)
+        except RuntimeError:
+            # O pool já foi encerrado (gravação parada): descarta o chunk
+            with self._pending_lock:
+                self._pending_chunks.clear()
+                self._pending_worker_active = False
+
+    @staticmethod
+    def _is_silence(chunk_data):
+        """
+        Verifica se o chunk int16 está abaixo do limiar de energia (SILENCE_RMS_THRESHOLD).
+        O RMS é calculado direto sobre os inteiros (promovidos a int32), sem converter para float.
+        """
+        if len(chunk_data) == 0:
+            return True
+        rms = np.sqrt(np.mean(np.square(chunk_data, dtype=np.int32), dtype=np.float64))
+        return rms < SILENCE_RMS_THRESHOLD
+
+    def _drain_pending_chunks(self):
+        """
+        Transcreve os chunks pendentes até esvaziar a fila.
+        Quando mais de um chunk se acumulou, eles são transcritos em lote.
+        """
+        while True:
+            with self._pending_lock:
+                if not self._pending_chunks:
+                    self._pending_worker_active = False
+                    return
+                batch = self._pending_chunks[:REALTIME_MAX_BATCH]
+                del self._pending_chunks[:REALTIME_MAX_BATCH]
+                
+            if len(batch) == 1:
+                self._transcribe_chunk(batch[0])
+            else:
+                self._transcribe_chunk_batch(batch)
+
+    def _to_pooled_float(self, chunk_data):
+        """Converte um chunk int16 do pool para float32 em outro buffer do pool e devolve o int16."""
+        chunk_float = int16_to_float32(chunk_data, out=self._float_pool.acquire()[:len(chunk_data)])
+        self._int16_pool.release(chunk_data)
+        return chunk_float
+
+    def _transcribe_chunk_batch(self, chunks):
+        """Transcreve vários chunks em uma única chamada e chama o callback para cada resultado."""
+        chunks_float = [self._to_pooled_float(c) for c in chunks]
+        try:
+            logger.info(f"Transcrevendo {len(chunks_float)} chunks pendentes em lote")
+            results = transcribe_audio_batch(chunks_float, self.rate)
+            
+            # Entrega os resultados na ordem de captura
+            if self.transcription_callback:
+                for result in results:
+                    self.transcription_callback(result, False)
+                    
+        except Exception as e:
+            logger.error(f"Erro na transcrição de chunks em lote: {e}")
+            if self.transcription_callback:
+                self.transcription_callback(f"[Erro: {str(e)}]", False)
+        finally:
+            for chunk_float in chunks_float:
+                self._float_pool.release(chunk_float)
 
     def _transcribe_chunk(self, chunk_data):
         """Transcreve um chunk de áudio e chama o callback com o resultado."""
+        # Converte para float32 antes de transcrever
+        # Normaliza para intervalo [-1.0, 1.0] que é o esperado pelo modelo Whisper
+        # Cast e escala em uma única passada, direto em um buffer do pool
+        chunk_data_float = self._to_pooled_float(chunk_data)
         try:
-            # Converte para float32 antes de transcrever
-            # Normaliza para intervalo [-1.0, 1.0] que é o esperado pelo modelo Whisper
-            # Faz isso in-place quando possível para economizar memória
-            if chunk_data.dtype != np.float32:
-                chunk_data_float = chunk_data.astype(np.float32) / 32768.0
-            else:
-                # Se já for float32, normaliza in-place
-                chunk_data_float = chunk_data / np.max(np.abs(chunk_data)) if np.max(np.abs(chunk_data)) > 0 else chunk_data
-            
             # Transcreve o chunk - passa uma visão do array ao invés de uma cópia
             result = transcribe_audio(frames=chunk_data_float, sample_rate=self.rate)
             
@@ -227,13 +451,13 @@ class AudioRecorder:
             if self.transcription_callback:
                 self.transcription_callback(result, False)  # False indica que não é o texto final
                 
-            # Limpa referências para ajudar o GC
-            del chunk_data_float
-                
         except Exception as e:
             logger.error(f"Erro na transcrição de chunk: {e}")
             if self.transcription_callback:
                 self.transcription_callback(f"[Erro: {str(e)}]", False)
+        finally:
+            # Devolve o buffer ao pool para o próximo chunk
+            self._float_pool.release(chunk_data_float)
                 
     def set_realtime_transcription(self, enabled, chunk_duration=2.0, callback=None):
         """
@@ -247,15 +471,12 @@ class AudioRecorder:
         """
         # Limpa todas as variáveis relacionadas à transcrição anterior
         if not enabled and self.realtime_transcription:
-            self.chunk_frames = []
             self.transcription_callback = None
-            import gc
-            gc.collect()  # Força liberação de memória não utilizada
         
         self.realtime_transcription = enabled
         self.chunk_duration = chunk_duration
         self.transcription_callback = callback
-        self.chunk_frames = []
+        self.chunk_start = self.total_written
         self.last_chunk_time = time.time()
         
         logger.info(f"Transcrição em tempo real: {'ativada' if enabled else 'desativada'}")
@@ -268,8 +489,7 @@ class AudioRecorder:
         if self.chunk_processor:
             try:
                 # Obtém uma cópia segura de todos os frames
-                with self.buffer_lock:
-                    frames_ref = list(self.frames)
+                frames_ref = self.get_frames()
                 
                 # Chama o processador de forma síncrona para garantir processamento final
                 self.chunk_processor(frames_ref, True)  # True indica que é o último chunk
@@ -284,12 +504,9 @@ class AudioRecorder:
         if hasattr(self, 'audio') and self.audio:
             self.audio.terminate()
         
-        # Libera memória
-        self.chunk_frames = []
-        
-        # Força coleta de lixo para liberar memória
-        import gc
-        gc.collect()
+        # Encerra o pool sem bloquear quem chamou: as transcrições já enfileiradas terminam
+        if self._executor:
+            self._executor.shutdown(wait=False)
         
         logger.info("Gravação finalizada")
 
@@ -297,10 +514,43 @@ class AudioRecorder:
         # Retorna se está gravando ou não
         return self.recording
     
+    def available_samples(self):
+        # Retorna o total de amostras (intercaladas) recebidas desde o início da gravação
+        return self.total_written
+    
     def get_frames(self):
-        # Retorna uma cópia segura dos frames atuais
-        with self.buffer_lock:
-            return list(self.frames)
+        # Retorna uma cópia segura dos frames atuais, dividida em chunks
+        # (visões de um único array contíguo, sem alocações por chunk)
+        audio = self.get_audio()
+        return [audio[i:i + self.chunk] for i in range(0, len(audio), self.chunk)]
+
+    def get_window(self, n_samples, copy=True):
+        """
+        Retorna as últimas n_samples amostras e a posição absoluta da primeira delas.
+        
+        A posição (contada desde o início da gravação, como total_written) permite ao
+        transcritor reconhecer o trecho sobreposto entre janelas consecutivas.
+        
+        Args:
+            n_samples: Número de amostras (intercaladas) desejado
+            copy: Se False, retorna uma visão do buffer circular quando os dados são
+                  contíguos; só é seguro se o áudio for consumido antes de ser sobrescrito
+            
+        Returns:
+            Tuple[np.ndarray, int]: Array int16 contíguo e posição da primeira amostra
+        """
+        end = self.total_written
+        audio = self._read_range(end - n_samples, end, copy)
+        return audio, end - len(audio)
+
+    def get_audio(self, copy=True):
+        """
+        Retorna todo o áudio do buffer circular como um único array int16 contíguo.
+        
+        Args:
+            copy: Se False, evita a cópia quando os dados não atravessam o fim do buffer
+        """
+        return self._read_last(self.window_samples, copy)
 
     def cleanup(self):
         # Libera recursos do PyAudio ao fechar o programa
@@ -321,15 +571,14 @@ class AudioRecorder:
 
     def transcribe_recording(self):
         """Transcreve a gravação atual e retorna o texto."""
-        if not self.frames:
+        # Obtém todo o áudio do buffer circular em um único array (sem cópia quando possível)
+        all_frames = self.get_audio(copy=False)
+        if len(all_frames) == 0:
             logger.warning("Não há dados de áudio para transcrever")
             return "Nenhum áudio para transcrever"
-            
-        # Concatena todos os frames em um único array
-        all_frames = np.concatenate(self.frames)
         
         # Converte para float32 e normaliza para o intervalo [-1.0, 1.0]
-        all_frames_float = all_frames.astype(np.float32) / 32768.0
+        all_frames_float = int16_to_float32(all_frames)
         
         # Envia para transcrição
         result = transcribe_audio(frames=all_frames_float, sample_rate=self.rate)
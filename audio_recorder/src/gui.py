@@ -10,23 +10,32 @@ Suporta transcrição em tempo real e em lote (após a gravação).
 import tkinter as tk            # Framework de GUI
 from tkinter import scrolledtext # Widget para exibir e rolar texto
 import threading                # Para operações em segundo plano
-import time, os                 # Para operações de temporização e sistema de arquivos
+import os                       # Para operações de sistema de arquivos
 import sys                      # Para manipulação de caminhos de sistema
 import logging                  # Para logs
+import collections              # Fila de segmentos da transcrição ao vivo
+import difflib                  # Busca da sobreposição entre transcrições
 
 # Adiciona o diretório raiz ao caminho de busca para importar constants
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from constants import (
     WINDOW_SECONDS,  # Define quanto tempo de áudio será mantido no buffer
-    SEGMENT_LENGTH,  # Tamanho de cada segmento de áudio para processamento
-    HOP_LENGTH,      # Intervalo entre os inícios de segmentos consecutivos 
+    SEGMENT_SAMPLES, # Tamanho de cada segmento (SEGMENT_LENGTH) em amostras
+    SAMPLE_RATE,     # Taxa de amostragem esperada pelo Whisper
+    REALTIME_MAX_BATCH, # Máximo de segmentos transcritos juntos
+    UI_FLUSH_INTERVAL_MS, # Intervalo mínimo entre atualizações do painel
+    HOP_SAMPLES,     # Intervalo entre segmentos consecutivos (HOP_LENGTH) em amostras
+    LIVE_POLL_INTERVAL_MS, # Intervalo de verificação de novos hops de áudio
     TEMP_DIR         # Diretório para arquivos temporários
 )
 
 # Importações de módulos do projeto
 from audio_recorder import AudioRecorder  # Classe para captura de áudio
 # Importamos da transcription_base que agora contém as funções anteriormente em audio_transcriber
-from transcription_base import save_frames_to_wav, transcribe_audio, get_default_transcriber, transcribe_microphone_realtime
+from transcription_base import (
+    transcribe_audio, get_default_transcriber, transcribe_microphone_realtime, to_whisper_audio,
+    is_silent, tail_context
+)
 
 class AudioRecorderGUI:
     """
@@ -48,12 +57,26 @@ class AudioRecorderGUI:
         
         # Criar o gravador com a janela de buffer configurada (mantém WINDOW_SECONDS de áudio)
         self.rec = AudioRecorder(window_seconds=WINDOW_SECONDS)
-        # Referência ao transcritor - pode ser alterada em tempo de execução se necessário
-        self.transcriber = get_default_transcriber()
+        
+        # Parâmetros de áudio e de segmentação, fixos durante a execução
+        self._rate = self.rec.rate             # Taxa de amostragem
+        self._channels = self.rec.channels     # Número de canais
+        self._sample_width = self.rec.audio.get_sample_size(self.rec.fmt)  # Tamanho da amostra
+        self._segment_samples = SEGMENT_SAMPLES * self._channels  # Amostras intercaladas por segmento
+        self._hop_samples = HOP_SAMPLES * self._channels          # Amostras intercaladas por hop
+        # Referência ao transcritor - carregada sob demanda (ver a propriedade transcriber)
+        self._transcriber = None
+        self._transcriber_lock = threading.Lock()
         
         # Variável para armazenar o texto acumulado durante o streaming
         self.accumulated_streaming_text = ""
         
+        # Atualizações do streaming são agrupadas e aplicadas por _flush_ui
+        self._pending_text = ""    # Último texto recebido, ainda não exibido
+        self._ui_dirty = False     # Indica que _pending_text precisa ser exibido
+        self._shown_text = ""      # Texto atualmente no painel
+        self._flush_scheduled = False  # Indica que _flush_ui já está agendado
+        
         # Configuração da janela principal
         root.title("Gravador de Áudio do Sistema")
         root.geometry("300x320")  # Tamanho inicial da janela
@@ -92,11 +115,48 @@ class AudioRecorderGUI:
         self.txt.config(state=tk.DISABLED)
         self.txt.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        # Carrega o modelo em segundo plano assim que o loop de eventos começar,
+        # para que a janela apareça sem esperar pelo carregamento
+        self.status.set("Carregando modelo…")
+        root.after(0, lambda: threading.Thread(target=self._load_transcriber, daemon=True).start())
+        
         # Configura handler para o fechamento da janela
         root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Garante que o diretório temporário existe
         os.makedirs(TEMP_DIR, exist_ok=True)
+        
+    @property
+    def transcriber(self):
+        """
+        Transcritor usado pela interface, carregado na primeira utilização.
+        Se o carregamento em segundo plano estiver em andamento, aguarda o seu término.
+        """
+        with self._transcriber_lock:
+            if self._transcriber is None:
+                self._transcriber = get_default_transcriber()
+            return self._transcriber
+            
+    @transcriber.setter
+    def transcriber(self, transcriber):
+        # Pode ser alterado em tempo de execução se necessário
+        with self._transcriber_lock:
+            self._transcriber = transcriber
+            
+    def _load_transcriber(self):
+        """Carrega o transcritor em segundo plano e atualiza o status ao terminar."""
+        try:
+            self.transcriber
+            status = "Pronto"
+        except Exception as e:
+            self.logger.error(f"Erro ao carregar o modelo: {e}")
+            status = "Erro ao carregar o modelo"
+            
+        # Não sobrescreve o status se o usuário já iniciou uma gravação
+        def update_status():
+            if self.status.get() == "Carregando modelo…":
+                self.status.set(status)
+        self.root.after(0, update_status)
 
     def toggle(self):
         """
@@ -115,7 +175,7 @@ class AudioRecorderGUI:
             # Inicia a gravação e a transcrição em tempo real em threads separadas
             # daemon=True faz as threads terminarem quando o programa principal termina
             threading.Thread(target=self.rec.start_recording, daemon=True).start()
-            threading.Thread(target=self._live_transcribe, daemon=True).start()
+            self._live_transcribe()
             
             # Desabilita o botão de streaming enquanto está gravando
             self.stream_btn.config(state=tk.DISABLED)
@@ -139,13 +199,15 @@ class AudioRecorderGUI:
             self.status.set("Gravando (Streaming)...")
             
             # Limpa transcrição anterior
+            self._shown_text = "Iniciando transcrição...\nO texto aparecerá aqui em breve.\n\nUsando modelo Whisper 'base' para economizar recursos."
             self.txt.config(state=tk.NORMAL)
             self.txt.delete("1.0", tk.END)
-            self.txt.insert(tk.END, "Iniciando transcrição...\nO texto aparecerá aqui em breve.\n\nUsando modelo Whisper 'base' para economizar recursos.")
+            self.txt.insert(tk.END, self._shown_text)
             self.txt.config(state=tk.DISABLED)
             
             # Reinicia o texto acumulado
             self.accumulated_streaming_text = ""
+            self._ui_dirty = False
             
             # Configura o callback para receber as transcrições em tempo real
             transcribe_microphone_realtime(
@@ -189,45 +251,42 @@ class AudioRecorderGUI:
         if len(text) > 50:
             self.logger.info(f"Recebido texto de {len(text)} caracteres")
         
-        # Evitar atualizar a UI com muita frequência (economizar recursos)
-        # Armazenamos o texto recebido e atualizamos a interface de forma controlada
-        # Usa after_idle para otimizar ainda mais
+        # Evitar atualizar a UI com muita frequência (economizar recursos):
+        # apenas registra o texto; _flush_ui o exibe no próximo intervalo
+        if is_final:
+            text += "\n\n--- Transcrição Completa ---"
         self.accumulated_streaming_text = text
-        self.root.after_idle(lambda: self._update_streaming_text(text, is_final))
+        self._pending_text = text
+        self._ui_dirty = True
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.root.after(UI_FLUSH_INTERVAL_MS, self._flush_ui)
         
-    def _update_streaming_text(self, text, is_final):
+    def _flush_ui(self):
         """
-        Atualiza a interface com o texto transcrito em streaming.
+        Exibe o último texto recebido pelo streaming.
         
-        Args:
-            text (str): Texto transcrito
-            is_final (bool): Se é o texto final da gravação
+        Agendado pelo callback no máximo uma vez a cada UI_FLUSH_INTERVAL_MS, de modo que
+        várias transcrições parciais recebidas nesse intervalo geram uma única atualização.
+        Apenas o trecho que difere do que já está no painel é reescrito, então o caso
+        comum, texto que só cresce, vira um único insert no fim.
         """
-        # Garante que temos um texto para mostrar
-        if not text:
-            return
+        self._flush_scheduled = False
+        if self._ui_dirty:
+            self._ui_dirty = False
+            text = self._pending_text
             
-        # Habilita a edição do texto
-        self.txt.config(state=tk.NORMAL)
-        
-        # Se é o texto final, adiciona uma marca
-        if is_final:
-            self.txt.delete("1.0", tk.END)
-            self.txt.insert(tk.END, text + "\n\n--- Transcrição Completa ---")
-        else:
-            # Atualiza o texto acumulado
-            self.accumulated_streaming_text = text
+            # Mantém o prefixo já exibido e substitui apenas o restante
+            keep = len(os.path.commonprefix([self._shown_text, text]))
+            self.txt.config(state=tk.NORMAL)
+            if keep < len(self._shown_text):
+                self.txt.delete(f"1.0 + {keep} chars", tk.END)
+            self.txt.insert(tk.END, text[keep:])
+            self._shown_text = text
             
-            # Mostra o texto na interface
-            self.txt.delete("1.0", tk.END)
-            self.txt.insert(tk.END, self.accumulated_streaming_text)
-        
-        # Rola para o final do texto
-        self.txt.see(tk.END)
-        self.txt.config(state=tk.DISABLED)
-        
-        # Forçar atualização imediata da janela
-        self.root.update_idletasks()
+            # Rola para o final do texto
+            self.txt.see(tk.END)
+            self.txt.config(state=tk.DISABLED)
 
     def transcribe(self):
         """
@@ -286,100 +345,202 @@ class AudioRecorderGUI:
         Realiza transcrição em tempo real com janelas sobrepostas.
         
         Esta função implementa a técnica de "janelas deslizantes sobrepostas":
-        1. Processa segmentos de áudio de tamanho SEGMENT_LENGTH
-        2. Move a janela de processamento a cada HOP_LENGTH segundos
-        3. Usa o contexto anterior para melhorar a continuidade da transcrição
+        1. Captura segmentos de áudio de tamanho SEGMENT_LENGTH
+        2. Move a janela de captura a cada HOP_LENGTH segundos de áudio gravado
+        3. Entrega os segmentos a uma thread consumidora, que os transcreve
+           (em lote quando vários se acumularam) usando o contexto anterior
+        
+        A captura é conduzida pelo próprio loop de eventos do Tkinter (ver
+        _pump_streaming); o pré-processamento e o modelo rodam em threads separadas.
+        """
+        # Limpa o painel de texto para a nova transcrição
+        self.clear_text()
+        
+        # Janelas capturadas aguardando pré-processamento
+        captured = collections.deque()
+        window_ready = threading.Event()
+        threading.Thread(
+            target=self._live_prepare, args=(captured, window_ready), daemon=True
+        ).start()
+        
+        # A primeira janela sai quando houver SEGMENT_LENGTH segundos gravados
+        self.root.after(
+            LIVE_POLL_INTERVAL_MS, self._pump_streaming,
+            captured, window_ready, self._segment_samples
+        )
+    
+    def _pump_streaming(self, captured, window_ready, next_capture):
         """
-        # Configurações de segmentação
-        segment_length = SEGMENT_LENGTH  # segundos
-        hop_length = HOP_LENGTH          # segundos
+        Verifica, a cada LIVE_POLL_INTERVAL_MS, se o próximo hop de áudio já foi gravado.
         
-        # Obtém parâmetros de áudio do gravador
-        rate = self.rec.rate             # Taxa de amostragem
-        channels = self.rec.channels     # Número de canais
-        fmt = self.rec.fmt               # Formato de áudio
-        sample_width = self.rec.audio.get_sample_size(fmt)  # Tamanho da amostra
+        O hop é medido em amostras recebidas, não em tempo de relógio, então as janelas
+        ficam alinhadas ao áudio mesmo quando o loop de eventos atrasa um tique.
         
-        # Calcula quantos buffers correspondem a um segmento e um hop
-        buffers_per_segment = int(rate * segment_length / self.rec.chunk)
-        buffers_per_hop = int(rate * hop_length / self.rec.chunk)
+        Args:
+            captured (collections.deque): Fila de janelas (segmento, posição); None encerra
+            window_ready (threading.Event): Sinalizado a cada nova janela na fila
+            next_capture (int): Posição (em amostras) em que a próxima janela termina
+        """
+        if not self.rec.get_recording_status():
+            # Sinaliza o fim da gravação; o restante do pipeline esvazia as filas
+            captured.append(None)
+            window_ready.set()
+            return
         
-        # Inicializa contexto vazio (será usado para continuidade entre segmentos)
-        context = ""
+        end = self.rec.available_samples()
+        if end >= next_capture:
+            # Obtém os últimos SEGMENT_LENGTH segundos e sua posição na gravação.
+            # Como o segmento espera na fila, é copiado do buffer circular (uma única
+            # cópia contígua, convertida depois direto para float32 pelo transcritor)
+            # O teste de silêncio (que pode rodar o silero-vad) fica em _live_prepare,
+            # fora da thread da interface
+            segment, start = self.rec.get_window(self._segment_samples)
+            captured.append((segment, start))
+            window_ready.set()
+            next_capture = start + len(segment) + self._hop_samples
+            
+        self.root.after(
+            LIVE_POLL_INTERVAL_MS, self._pump_streaming, captured, window_ready, next_capture
+        )
+    
+    def _live_prepare(self, captured, window_ready):
+        """
+        Prepara as janelas capturadas por _pump_streaming e as entrega ao consumidor.
         
-        # Contador para identificar os segmentos temporários
-        segment_counter = 0
+        A conversão e o mel-espectrograma do próximo segmento são calculados aqui
+        enquanto o consumidor executa o modelo sobre o atual. Janelas cujo hop novo
+        é silêncio são descartadas antes dessa etapa.
         
-        # Inicializa o texto completo da transcrição
-        full_text = ""
+        Args:
+            captured (collections.deque): Fila de janelas (segmento, posição); None encerra
+            window_ready (threading.Event): Sinalizado a cada nova janela na fila
+        """
+        # Parâmetros calculados uma única vez em __init__, lidos aqui como variáveis locais
+        rate = self._rate
+        channels = self._channels
+        sample_width = self._sample_width
+        hop_samples = self._hop_samples
+        
+        # As posições da gravação recomeçam do zero: descarta o estado da sessão anterior
+        transcriber = self.transcriber
+        if hasattr(transcriber, "clear_stream_context"):
+            transcriber.clear_stream_context()
+        
+        # Fila de segmentos preparados (ver prepare_frames) aguardando transcrição
+        pending = collections.deque()
+        segment_ready = threading.Event()
+        threading.Thread(
+            target=self._live_consume, args=(pending, segment_ready), daemon=True
+        ).start()
+        
+        prepare_frames = transcriber.prepare_frames
+        finished = False
+        while not finished:
+            window_ready.wait()
+            window_ready.clear()
+            while captured:
+                item = captured.popleft()
+                if item is None:
+                    finished = True
+                    break
+                segment, start = item
+                # Só o trecho novo decide: se não há fala nele, o segmento repetiria o
+                # texto anterior e a chamada ao modelo é evitada
+                if is_silent(segment[-hop_samples:], rate, channels):
+                    continue
+                pending.append(prepare_frames(
+                    segment, rate, channels, sample_width, start_sample=start
+                ))
+                segment_ready.set()
+                
+        # Sinaliza o fim da gravação; o consumidor esvazia a fila e transcreve o restante
+        pending.append(None)
+        segment_ready.set()
+    
+    def _live_consume(self, pending, segment_ready):
+        """
+        Consome os segmentos preparados por _live_prepare.
         
-        # Limpa o painel de texto para a nova transcrição
-        self.root.after(0, self.clear_text)
+        Um segmento isolado é transcrito com o contexto do anterior. Quando a transcrição
+        fica para trás e vários segmentos se acumulam, até REALTIME_MAX_BATCH deles são
+        transcritos juntos em uma única passada do modelo, amortizando o custo por chamada.
+        
+        Args:
+            pending (collections.deque): Fila de segmentos preparados; None encerra
+            segment_ready (threading.Event): Sinalizado a cada novo item na fila
+        """
+        # Parâmetros de áudio calculados em __init__
+        rate = self._rate
+        channels = self._channels
+        sample_width = self._sample_width
+        transcriber = self.transcriber
         
-        # Loop principal de transcrição em tempo real
-        while self.rec.get_recording_status():
-            # Obtém cópia segura dos frames atuais
-            frames = self.rec.get_frames()
-            total_buffers = len(frames)
+        # Inicializa contexto vazio (será usado para continuidade entre segmentos)
+        context = ""
+        
+        finished = False
+        while not finished:
+            segment_ready.wait()
+            segment_ready.clear()
             
-            # Verifica se temos áudio suficiente para processar
-            if total_buffers >= buffers_per_segment:
-                # Extrai os últimos N buffers para formar o segmento atual
-                seg_buffers = frames[-buffers_per_segment:]
-                
-                # Cria um arquivo WAV temporário para este segmento
-                seg_path = f"{TEMP_DIR}/live_seg_{segment_counter}.wav"
-                save_frames_to_wav(seg_buffers, seg_path, rate, channels, sample_width)
-                
-                # Transcreve o segmento, usando o contexto anterior para continuidade
-                segment_text = self.transcriber.transcribe_file(seg_path, initial_prompt=context)
-                
-                # Remove o arquivo temporário após uso
-                os.remove(seg_path)
-                
-                # Determina o novo texto a adicionar baseado no contexto anterior
-                new_text = self._extract_new_content(context, segment_text)
-                
-                # Atualiza o contexto para o próximo segmento
-                context = segment_text
-                
-                # Atualiza o texto completo
-                if new_text:
-                    full_text += " " + new_text if full_text else new_text
+            while pending:
+                # Retira até REALTIME_MAX_BATCH segmentos da fila
+                batch = []
+                while pending and len(batch) < REALTIME_MAX_BATCH:
+                    item = pending.popleft()
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                    
+                # Vários segmentos acumulados: uma única passada do modelo para todos
+                texts = None
+                if len(batch) > 1 and transcriber.supports_batch:
+                    audios = [
+                        p["audio"] if "audio" in p else to_whisper_audio(p["frames"], rate, channels)
+                        for p in batch
+                    ]
+                    texts = transcriber.transcribe_batch(audios, SAMPLE_RATE)
+                    
+                for i, prepared in enumerate(batch):
+                    if texts is not None:
+                        segment_text = texts[i]
+                    else:
+                        # Transcreve direto da memória, com o contexto do segmento anterior
+                        segment_text = transcriber.transcribe_prepared(
+                            prepared, initial_prompt=tail_context(context)
+                        )
+                    self._publish_live_text(context, segment_text)
+                    # Atualiza o contexto para o próximo segmento
+                    context = segment_text
+                    
+                if finished:
+                    break
                     
-                    # Atualiza a UI com o texto incrementalmente
-                    self.root.after(0, lambda t=new_text: self._append_text(t + " "))
-                
-                # Incrementa o contador de segmentos
-                segment_counter += 1
-                
-                # Espera pelo próximo hop (metade do tempo para permitir sobreposição)
-                time.sleep(hop_length / 2)
-            else:
-                # Se não temos áudio suficiente, aguarda um pouco
-                time.sleep(0.2)
-                
         # Processa qualquer áudio restante após parar a gravação
-        frames = self.rec.get_frames()
+        # (a gravação terminou, então o buffer circular não muda mais e dispensa a cópia)
+        frames = self.rec.get_audio(copy=False)
         if len(frames) > 0:
-            # Salva o áudio restante em um arquivo temporário
-            seg_path = f"{TEMP_DIR}/live_seg_last.wav"
-            save_frames_to_wav(frames, seg_path, rate, channels, sample_width)
-            
-            # Transcreve o último segmento
-            last_text = self.transcriber.transcribe_file(seg_path, initial_prompt=context)
-            
-            # Remove o arquivo temporário
-            os.remove(seg_path)
-            
-            # Extrai apenas o novo conteúdo
-            new_text = self._extract_new_content(context, last_text)
-            
-            # Atualiza o texto final se houver conteúdo novo
-            if new_text:
-                full_text += " " + new_text if full_text else new_text
-                # Adiciona o último trecho ao painel
-                self.root.after(0, lambda t=new_text: self._append_text(t))
+            # Transcreve o último segmento direto da memória
+            last_text = transcriber.transcribe_frames(
+                frames, rate, channels, sample_width, initial_prompt=tail_context(context)
+            )
+            self._publish_live_text(context, last_text)
+    
+    def _publish_live_text(self, context, segment_text):
+        """
+        Adiciona ao painel apenas o trecho de segment_text que não estava em context.
+        
+        Args:
+            context (str): Transcrição do segmento anterior
+            segment_text (str): Transcrição do segmento atual
+        """
+        # Determina o novo texto a adicionar baseado no contexto anterior
+        new_text = self._extract_new_content(context, segment_text)
+        
+        # Atualiza a UI com o texto incrementalmente
+        if new_text:
+            self.root.after(0, lambda t=new_text: self._append_text(t + " "))
     
     def _extract_new_content(self, previous_text, current_text):
         """
@@ -409,23 +570,14 @@ class AudioRecorderGUI:
         if len(words_current) < len(words_previous):
             return current_text
             
-        # Encontra o índice onde o texto novo começa
-        # Permite uma margem de erro para pequenas alterações no texto anterior
-        overlap_threshold = min(len(words_previous), 5)  # Usa até 5 palavras para verificar sobreposição
-        
-        for i in range(len(words_current) - overlap_threshold + 1):
-            # Verifica se as últimas palavras do texto anterior correspondem 
-            # a um trecho do texto atual
-            match = True
-            for j in range(min(overlap_threshold, len(words_previous))):
-                if i+j >= len(words_current) or j >= len(words_previous) or words_current[i+j] != words_previous[-min(overlap_threshold, len(words_previous))+j]:
-                    match = False
-                    break
-            
-            if match:
-                # Encontrou onde o texto anterior termina no atual
-                # Retorna apenas o texto novo que vem depois
-                return " ".join(words_current[i+overlap_threshold:])
+        # Encontra o maior bloco de palavras comum aos dois textos em uma única busca
+        # (sem limite de tamanho da sobreposição); o texto novo é o que vem depois dele
+        matcher = difflib.SequenceMatcher(None, words_previous, words_current, autojunk=False)
+        match = matcher.find_longest_match(0, len(words_previous), 0, len(words_current))
+        
+        # Exige algumas palavras em comum para não casar apenas artigos e preposições
+        if match.size >= min(len(words_previous), 3):
+            return " ".join(words_current[match.b + match.size:])
         
         # Se não conseguiu encontrar uma sobreposição clara,
         # retorna a segunda metade do texto atual como aproximação
@@ -469,6 +621,7 @@ class AudioRecorderGUI:
         self.txt.config(state=tk.NORMAL)
         self.txt.delete("1.0", tk.END)
         self.txt.config(state=tk.DISABLED)
+        self._shown_text = ""
 
 # Ponto de entrada quando o script é executado diretamente
 if __name__ == '__main__':
@@ -0,0 +1,329 @@
+# inference_process.py
+# Executa o transcritor em um processo separado, fora do GIL do processo da interface
+
+import os
+import sys
+import time
+import logging
+import queue
+import itertools
+import threading
+import multiprocessing
+from multiprocessing.connection import Listener, Client
+
+# Adiciona o diretório raiz ao caminho de busca para importar constants
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from constants import (
+    SAMPLE_RATE,
+    TRANSCRIBER_BACKEND,
+    INFERENCE_SERVER_ADDRESS,
+    INFERENCE_SERVER_AUTHKEY
+)
+from transcription_base import AudioTranscriber, create_transcriber
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("InferenceProcess")
+
+# Únicos métodos do transcritor que podem ser chamados pelo processo pai ou pelos clientes do servidor
+_ALLOWED_METHODS = frozenset({
+    "transcribe", "transcribe_frames", "transcribe_file", "transcribe_batch",
+    "set_language", "set_translation", "clear_stream_context", "supports_batch"
+})
+
+def _run_job(transcriber, method, args, kwargs):
+    """Executa um pedido no transcritor e retorna a tupla (sucesso, resultado)."""
+    if method not in _ALLOWED_METHODS:
+        return False, f"Método não permitido: {method!r}"
+    try:
+        if method == "transcribe_batch" and not hasattr(transcriber, "transcribe_batch"):
+            result = [transcriber.transcribe(audio, *args[1:], **kwargs) for audio in args[0]]
+        elif method == "clear_stream_context" and not hasattr(transcriber, method):
+            # Backends sem contexto de stream não têm o que limpar
+            result = None
+        elif method == "supports_batch":
+            # Consulta, não chamada: o processo pai só envia lotes que o backend processa de fato
+            result = transcriber.supports_batch
+        else:
+            result = getattr(transcriber, method)(*args, **kwargs)
+        return True, result
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+def _serve(backend, jobs, results):
+    """
+    Laço do processo filho: carrega o transcritor uma única vez e executa os pedidos em ordem.
+    
+    Cada pedido é uma tupla (job_id, método, args, kwargs); a resposta é
+    (job_id, sucesso, resultado). None encerra o processo. A primeira resposta
+    (job_id None) informa se o carregamento deu certo e o supports_batch do backend.
+    """
+    try:
+        transcriber = create_transcriber(backend)
+    except Exception as e:
+        results.put((None, False, f"{type(e).__name__}: {e}"))
+        return
+    results.put((None, True, transcriber.supports_batch))
+    
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, method, args, kwargs = job
+        results.put((job_id, *_run_job(transcriber, method, args, kwargs)))
+
+def _serve_client(transcriber, lock, conn):
+    """Atende os pedidos de um cliente do servidor de inferência até ele desconectar."""
+    with conn:
+        while True:
+            try:
+                job = conn.recv()
+            except (EOFError, OSError):
+                return
+            if job is None:
+                return
+            job_id, method, args, kwargs = job
+            # O modelo é um só: os pedidos de todos os clientes são executados em série
+            with lock:
+                ok, result = _run_job(transcriber, method, args, kwargs)
+            try:
+                conn.send((job_id, ok, result))
+            except (EOFError, OSError):
+                return
+
+def serve(address=INFERENCE_SERVER_ADDRESS, backend=TRANSCRIBER_BACKEND):
+    """
+    Servidor de inferência persistente: carrega o modelo uma única vez e o
+    compartilha entre todos os processos do programa que se conectarem a address.
+    
+    Cada conexão usa o mesmo protocolo de _serve. Idioma, tradução e contexto de
+    stream pertencem ao transcritor do servidor e, portanto, valem para todos os clientes.
+    
+    Parâmetros:
+        address (str): Socket Unix ou named pipe do Windows onde o servidor escuta
+        backend (str): Backend do transcritor (ver TRANSCRIBER_BACKEND)
+    """
+    if not address:
+        raise ValueError("Defina INFERENCE_SERVER_ADDRESS ou informe --address")
+    if not INFERENCE_SERVER_AUTHKEY:
+        raise ValueError("Defina INFERENCE_SERVER_AUTHKEY com uma chave secreta antes de iniciar o servidor")
+    
+    logger.info(f"Carregando transcritor do servidor de inferência (backend: {backend})...")
+    transcriber = create_transcriber(backend)
+    lock = threading.Lock()
+    
+    # Socket Unix criado já com permissão 0600: só o próprio usuário pode se conectar
+    old_umask = os.umask(0o177) if os.name == "posix" else None
+    try:
+        listener = Listener(address, authkey=INFERENCE_SERVER_AUTHKEY)
+    finally:
+        if old_umask is not None:
+            os.umask(old_umask)
+    
+    with listener:
+        logger.info(f"Servidor de inferência escutando em {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, multiprocessing.AuthenticationError) as e:
+                logger.warning(f"Conexão recusada: {e}")
+                continue
+            threading.Thread(target=_serve_client, args=(transcriber, lock, conn),
+                             name="InferenceClient", daemon=True).start()
+
+class InferenceProcess(AudioTranscriber):
+    """
+    Transcritor que delega a inferência a um processo filho de longa duração.
+    
+    O modelo é carregado uma única vez no filho, e as chamadas (transcribe_frames,
+    transcribe, ...) trafegam por multiprocessing.Queue. As threads do processo da
+    interface passam a apenas aguardar o resultado, sem disputar o GIL com o código
+    Python do Whisper. A segmentação de transcribe_from_recorder continua acontecendo
+    aqui; só os segmentos são enviados ao filho.
+    
+    Se houver um servidor de inferência (serve) escutando em address, os pedidos vão
+    para ele pela conexão, e o modelo já carregado lá é compartilhado com os demais
+    processos em vez de cada um iniciar o seu.
+    """
+    
+    def __init__(self, backend=TRANSCRIBER_BACKEND, address=INFERENCE_SERVER_ADDRESS):
+        """
+        Conecta ao servidor de inferência ou inicia o processo filho e aguarda o carregamento do modelo.
+        
+        Parâmetros:
+            backend (str): Backend usado no processo filho (ver TRANSCRIBER_BACKEND)
+            address (str, opcional): Endereço do servidor de inferência compartilhado
+        """
+        super().__init__()
+        self._process = None
+        self._conn = self._connect(address) if address else None
+        self._connected = self._conn is not None
+        self._send_lock = threading.Lock()
+        
+        if self._conn is None:
+            # "spawn" evita herdar por fork o estado do PyTorch/PyAudio do processo pai
+            ctx = multiprocessing.get_context("spawn")
+            self._jobs = ctx.Queue()
+            self._results = ctx.Queue()
+            self._process = ctx.Process(
+                target=_serve, args=(backend, self._jobs, self._results),
+                name="InferenceProcess", daemon=True
+            )
+            
+            logger.info(f"Iniciando processo de inferência (backend: {backend})...")
+            start_time = time.time()
+            self._process.start()
+            
+            # O filho pode morrer antes de responder (erro de import, falta de memória ao
+            # carregar o modelo); sem checar, o get bloquearia para sempre
+            while True:
+                try:
+                    _, ok, result = self._results.get(timeout=1.0)
+                    break
+                except queue.Empty:
+                    if not self._process.is_alive():
+                        raise RuntimeError(
+                            f"O processo de inferência terminou durante o carregamento (código {self._process.exitcode})"
+                        )
+            if not ok:
+                raise RuntimeError(f"Falha ao carregar o transcritor no processo de inferência: {result}")
+            self.supports_batch = result
+            logger.info(f"Processo de inferência pronto em {time.time() - start_time:.2f} segundos")
+        
+        # Pedidos em andamento: job_id -> [evento, sucesso, resultado]
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._job_ids = itertools.count()
+        threading.Thread(target=self._dispatch_results, name="InferenceResults", daemon=True).start()
+        
+        if self._conn is not None:
+            self.supports_batch = self._call("supports_batch")
+        
+        # Espelho das configurações, usado nas chaves do cache de transcrições
+        self.language = "pt"
+        self.translate = False
+        
+    @staticmethod
+    def _connect(address):
+        """Tenta conectar ao servidor de inferência; retorna None se ele não estiver ativo."""
+        if not INFERENCE_SERVER_AUTHKEY:
+            logger.warning("INFERENCE_SERVER_AUTHKEY não definida; ignorando o servidor de inferência")
+            return None
+        try:
+            conn = Client(address, authkey=INFERENCE_SERVER_AUTHKEY)
+        except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+            logger.info(f"Servidor de inferência indisponível em {address} ({e}); iniciando processo próprio")
+            return None
+        logger.info(f"Conectado ao servidor de inferência em {address}")
+        return conn
+        
+    def _alive(self):
+        """Indica se o servidor ou o processo filho ainda pode responder."""
+        if self._process is None:
+            return self._connected
+        return self._process.is_alive()
+        
+    def _dispatch_results(self):
+        """Entrega cada resposta do processo filho à thread que fez o pedido."""
+        while True:
+            try:
+                if self._conn is not None:
+                    job_id, ok, result = self._conn.recv()
+                else:
+                    job_id, ok, result = self._results.get()
+            except (EOFError, OSError):
+                self._connected = False
+                return
+            with self._pending_lock:
+                waiter = self._pending.pop(job_id, None)
+            if waiter is not None:
+                waiter[1:] = [ok, result]
+                waiter[0].set()
+                
+    def _call(self, method, *args, **kwargs):
+        """
+        Executa um método do transcritor no processo filho e aguarda o resultado.
+        
+        Levanta:
+            RuntimeError: Se o método falhar ou o processo filho tiver terminado
+        """
+        job_id = next(self._job_ids)
+        waiter = [threading.Event(), False, None]
+        with self._pending_lock:
+            self._pending[job_id] = waiter
+        job = (job_id, method, args, kwargs)
+        if self._conn is not None:
+            try:
+                with self._send_lock:
+                    self._conn.send(job)
+            except (EOFError, OSError):
+                self._connected = False
+        else:
+            self._jobs.put(job)
+        
+        while not waiter[0].wait(timeout=1.0):
+            if not self._alive():
+                with self._pending_lock:
+                    self._pending.pop(job_id, None)
+                raise RuntimeError("O processo de inferência terminou inesperadamente")
+                
+        if not waiter[1]:
+            raise RuntimeError(f"Erro no processo de inferência ({method}): {waiter[2]}")
+        return waiter[2]
+        
+    def transcribe_file(self, file_path: str, initial_prompt: str = None) -> str:
+        """Transcreve um arquivo de áudio no processo de inferência."""
+        return self._call("transcribe_file", file_path, initial_prompt=initial_prompt)
+        
+    def transcribe_frames(self, frames, rate: int, channels: int, sample_width: int,
+                          initial_prompt: str = None, start_sample: int = None) -> str:
+        """Transcreve frames PCM no processo de inferência (ver AudioTranscriber.transcribe_frames)."""
+        return self._call("transcribe_frames", frames, rate, channels, sample_width,
+                          initial_prompt=initial_prompt, start_sample=start_sample)
+        
+    def transcribe(self, audio, sample_rate: int = SAMPLE_RATE) -> str:
+        """Transcreve um array de áudio no processo de inferência."""
+        return self._call("transcribe", audio, sample_rate)
+        
+    def transcribe_batch(self, audios, sample_rate: int = SAMPLE_RATE) -> list:
+        """Transcreve vários trechos em uma única chamada ao processo de inferência."""
+        return self._call("transcribe_batch", list(audios), sample_rate)
+        
+    def clear_stream_context(self):
+        """Limpa o contexto de stream do transcritor no processo de inferência."""
+        self._call("clear_stream_context")
+        
+    def set_language(self, language_code: str):
+        """Define o idioma para transcrição."""
+        self._call("set_language", language_code)
+        self.language = language_code
+        
+    def set_translation(self, translate: bool):
+        """Define se deve traduzir para inglês."""
+        self._call("set_translation", translate)
+        self.translate = translate
+        
+    def close(self):
+        """Encerra o processo de inferência (ou só a conexão, no caso do servidor compartilhado)."""
+        if self._conn is not None:
+            if self._connected:
+                try:
+                    with self._send_lock:
+                        self._conn.send(None)
+                except (EOFError, OSError):
+                    pass
+            self._connected = False
+            self._conn.close()
+        elif self._process.is_alive():
+            self._jobs.put(None)
+            self._process.join(timeout=5)
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Servidor de inferência compartilhado entre os processos do programa")
+    parser.add_argument("--address", default=INFERENCE_SERVER_ADDRESS,
+                        help="Socket Unix ou named pipe do Windows (padrão: INFERENCE_SERVER_ADDRESS)")
+    parser.add_argument("--backend", default=TRANSCRIBER_BACKEND, help="Backend do transcritor")
+    cli_args = parser.parse_args()
+    serve(cli_args.address, cli_args.backend)
@@ -0,0 +1,139 @@
+# openvino_transcriber.py
+# Implementação de transcrição usando o Whisper exportado para OpenVINO (openvino-genai)
+
+import os
+import sys
+import time
+import subprocess
+import logging
+import numpy as np
+
+# Adiciona o diretório raiz ao caminho de busca para importar constants
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from constants import (
+    OPENVINO_MODEL_DIR,
+    OPENVINO_MODEL_ID,
+    OPENVINO_WEIGHT_FORMAT,
+    OPENVINO_DEVICE,
+    OPENVINO_CACHE_DIR
+)
+from transcription_base import AudioTranscriber, load_wav_audio
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("OpenVINOWhisperTranscriber")
+
+class OpenVINOWhisperTranscriber(AudioTranscriber):
+    """
+    Transcritor de áudio usando o WhisperPipeline do openvino-genai.
+
+    Se o diretório do modelo não existir, ele é exportado na primeira execução com
+    pesos quantizados em int8 (NNCF), o equivalente a:
+        optimum-cli export openvino --model openai/whisper-base --weight-format int8 models/whisper-base-ov
+
+    O plano de execução compilado é salvo em CACHE_DIR, então a próxima abertura
+    do programa carrega o modelo já compilado em vez de recompilar tudo.
+    """
+
+    def __init__(self, model_dir=OPENVINO_MODEL_DIR, device=OPENVINO_DEVICE, cache_dir=OPENVINO_CACHE_DIR):
+        """
+        Inicializa o pipeline OpenVINO com o modelo exportado.
+
+        Parâmetros:
+            model_dir (str): Diretório com o modelo Whisper exportado para OpenVINO
+            device (str): Dispositivo OpenVINO ('CPU', 'GPU', 'NPU')
+            cache_dir (str): Diretório do cache de modelos compilados
+        """
+        super().__init__()
+        import openvino_genai
+
+        if not os.path.isdir(model_dir):
+            self._export_model(model_dir)
+
+        logger.info(f"Carregando modelo OpenVINO de {model_dir} no dispositivo {device}...")
+        start_time = time.time()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.pipeline = openvino_genai.WhisperPipeline(model_dir, device, CACHE_DIR=cache_dir)
+        logger.info(f"Modelo carregado em {time.time() - start_time:.2f} segundos")
+
+        self.device = device
+
+        # Configurações de transcrição
+        self.language = "pt"  # Idioma padrão Português
+        self.translate = False  # Por padrão, não traduz para inglês
+
+    @staticmethod
+    def _export_model(model_dir: str):
+        """
+        Exporta OPENVINO_MODEL_ID para OpenVINO com o optimum-intel, quantizando os pesos.
+
+        Usa o optimum-cli (em vez de OVModelForSpeechSeq2Seq) porque ele também converte
+        o tokenizer para o formato que o WhisperPipeline do openvino-genai espera.
+
+        Parâmetros:
+            model_dir (str): Diretório onde o modelo exportado será salvo
+        """
+        logger.info(f"Exportando {OPENVINO_MODEL_ID} para OpenVINO ({OPENVINO_WEIGHT_FORMAT}) em {model_dir}...")
+        start_time = time.time()
+        subprocess.run(
+            [sys.executable, "-m", "optimum.commands.optimum_cli", "export", "openvino",
+             "--model", OPENVINO_MODEL_ID, "--weight-format", OPENVINO_WEIGHT_FORMAT, model_dir],
+            check=True
+        )
+        logger.info(f"Modelo exportado em {time.time() - start_time:.2f} segundos")
+
+    def _generate(self, audio: np.ndarray, initial_prompt: str = None, final: bool = False) -> str:
+        """
+        Executa o pipeline sobre um array float32 mono a 16kHz.
+
+        Parâmetros:
+            audio (np.ndarray): Áudio a transcrever
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            final (bool): Ignorado; o pipeline usa as mesmas opções em todos os casos
+
+        Retorna:
+            str: Texto transcrito
+        """
+        options = {
+            "language": f"<|{self.language}|>",
+            "task": "translate" if self.translate else "transcribe",
+            "return_timestamps": False
+        }
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+
+        result = self.pipeline.generate(np.ascontiguousarray(audio, dtype=np.float32), **options)
+        return str(result.texts[0] if result.texts else "").strip()
+
+    def transcribe_file(self, file_path: str, initial_prompt: str = None) -> str:
+        """
+        Transcreve um arquivo de áudio usando o pipeline OpenVINO.
+
+        Parâmetros:
+            file_path (str): Caminho para o arquivo de áudio
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+
+        Retorna:
+            str: Texto transcrito do áudio
+        """
+        logger.info(f"Transcrevendo arquivo: {file_path}")
+
+        if not os.path.exists(file_path):
+            logger.error(f"Arquivo não encontrado: {file_path}")
+            return ""
+
+        try:
+            # WAVs PCM de 16 bits são lidos direto; outros formatos são decodificados pela
+            # função do openai-whisper (via ffmpeg), como no WhisperTranscriber
+            audio = load_wav_audio(file_path)
+            if audio is None:
+                import whisper
+                audio = whisper.load_audio(file_path)
+
+            start_time = time.time()
+            text = self._generate(audio, initial_prompt)
+            logger.info(f"Transcrição concluída em {time.time() - start_time:.2f}s. Obtidos {len(text)} caracteres.")
+            return text
+        except Exception as e:
+            logger.error(f"Erro ao transcrever arquivo {file_path}: {e}")
+            return f"[ERRO DE TRANSCRIÇÃO: {str(e)}]"
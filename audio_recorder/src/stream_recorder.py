@@ -9,20 +9,23 @@ import traceback
 from typing import Callable, List, Dict, Any, Optional
 from dataclasses import dataclass, field
 import datetime
+import os
+import sys
 
-from .whisper_transcriber import WhisperTranscriber
+try:
+    from transcription_base import int16_to_float32
+except ImportError:
+    from .transcription_base import int16_to_float32
 
-# Configurações globais
-SAMPLE_RATE = 16000  # Taxa de amostragem compatível com Whisper
-CHUNK_SIZE = 1024    # Tamanho do chunk de áudio
-CHANNELS = 1         # Mono
-FORMAT = pyaudio.paInt16  # Formato de áudio
-MAX_HISTORY_SECONDS = 30  # Máximo de história de áudio em segundos
+# Configurações de áudio compartilhadas (uma única fonte: constants.py)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from constants import SAMPLE_RATE, CHUNK_SIZE, CHANNELS, SAMPLE_FORMAT
 
 # Configurações para detecção de silêncio
 SILENCE_THRESHOLD = 0.005  # Limiar para considerar como silêncio (amplitude)
 MIN_SILENCE_DURATION = 0.7  # Duração mínima de silêncio para considerar pausa natural (segundos)
 MAX_SPEECH_DURATION = 7.0   # Duração máxima de fala contínua sem pausas forçadas (segundos)
+MAX_HISTORY_SECONDS = 60    # Duração do áudio mantido no buffer circular e enviado para transcrição (segundos)
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -37,9 +40,9 @@ class StreamRecorder:
                  transcriber,
                  on_transcription: Optional[Callable[[str], None]] = None,
                  device_index: Optional[int] = None,
-                 sample_rate: int = 16000,
-                 chunk_size: int = 1024,
-                 channels: int = 1):
+                 sample_rate: int = SAMPLE_RATE,
+                 chunk_size: int = CHUNK_SIZE,
+                 channels: int = CHANNELS):
         """
         Inicializa o gravador de stream.
         
@@ -70,32 +73,138 @@ class StreamRecorder:
         self._stop_event = threading.Event()
         self._process_thread = None
         
-        # Buffer de acumulação de áudio
-        self._audio_buffer_lock = threading.Lock()
-        self._accumulated_buffer = np.array([], dtype=np.float32)
+        # Buffer circular pré-alocado com os últimos MAX_HISTORY_SECONDS de áudio:
+        # o callback escreve no lugar, sem realocar nem copiar o histórico a cada bloco.
+        # Há um único produtor (callback do PortAudio) e um único consumidor (a thread de
+        # processamento), sincronizados sem lock: o tamanho é a próxima potência de dois
+        # acima do histórico, e a folga evita que o trecho lido seja sobrescrito durante a cópia.
+        # As amostras ficam em int16, como chegam do PortAudio: metade da memória de um
+        # buffer float32, e a conversão acontece uma única vez, na hora de transcrever
+        self._history_samples = int(MAX_HISTORY_SECONDS * sample_rate)
+        ring_size = 1 << self._history_samples.bit_length()
+        self._ring = np.zeros(ring_size, dtype=np.int16)
+        self._ring_mask = ring_size - 1
+        
+        # SILENCE_THRESHOLD elevado ao quadrado na escala int16 (limiar por amostra)
+        self._silence_ss_threshold = (SILENCE_THRESHOLD * 32768) ** 2
+        
+        # Destino reutilizado da conversão para float32 feita antes de cada transcrição
+        self._float_buffer = np.empty(self._history_samples, dtype=np.float32)
+        
+        # Total de amostras recebidas desde o início da gravação. Só o callback escreve,
+        # e sempre depois das amostras; o consumidor lê a posição antes de ler o buffer
+        # (atribuição de inteiro é atômica sob o GIL)
+        self._total_written = 0
         
         # Estado para detecção de silêncio
         self._is_speech = False
         self._silence_start = 0
         self._speech_start = 0
-        self._last_process_time = time.time()
+        self._last_process_time = time.monotonic()
         
     def _detect_silence(self, audio_data):
         """
         Detecta silêncio no áudio para identificar pausas naturais na fala.
         
+        O teste é feito direto sobre as amostras int16, sem converter para float: a soma
+        dos quadrados (acumulada em int64, sem array intermediário) é comparada ao
+        limiar SILENCE_THRESHOLD pré-calculado na mesma escala, o que equivale a
+        comparar o RMS.
+        
         Args:
-            audio_data: Array numpy com dados de áudio
+            audio_data: Array numpy int16 com dados de áudio
             
         Returns:
             bool: True se for silêncio, False se for fala
         """
-        if audio_data is None or len(audio_data) == 0:
+        if audio_data is None or audio_data.size == 0:
             return True
             
-        # Calcula amplitude RMS do áudio
-        rms = np.sqrt(np.mean(np.square(audio_data)))
-        return rms < SILENCE_THRESHOLD
+        sum_squares = int(np.einsum('i,i->', audio_data, audio_data, dtype=np.int64))
+        return sum_squares < self._silence_ss_threshold * audio_data.size
+        
+    def _update_speech_state(self, checked_position, current_position):
+        """
+        Atualiza o estado de silêncio/fala com o áudio gravado desde a última verificação.
+        
+        Executado na thread de processamento, fora do callback de áudio. O áudio novo é
+        analisado em blocos do tamanho de um chunk, como chegou do PortAudio, e o instante
+        de cada transição é estimado pela posição do bloco na gravação, de modo que uma
+        verificação atrasada (por exemplo, durante uma transcrição) não desloca as pausas.
+        
+        Args:
+            checked_position: Posição (em amostras) até onde o áudio já foi analisado
+            current_position: Posição atual da gravação
+            
+        Returns:
+            int: Nova posição analisada
+        """
+        block = self.chunk_size * self.channels
+        checked_position = max(checked_position, current_position - self._history_samples)
+        current_time = time.monotonic()
+        
+        while checked_position + block <= current_position:
+            # Visão direta do buffer circular: o bloco é analisado na hora, sem cópia
+            is_silence = self._detect_silence(
+                self._read_range(checked_position, checked_position + block, copy=False)
+            )
+            checked_position += block
+            block_time = current_time - (current_position - checked_position) / (
+                self.sample_rate * self.channels
+            )
+            
+            # Se mudamos de silêncio para fala, marca o início da fala
+            if not is_silence and not self._is_speech:
+                self._is_speech = True
+                self._speech_start = block_time
+                
+            # Se mudamos de fala para silêncio, marca o início do silêncio
+            elif is_silence and self._is_speech:
+                self._is_speech = False
+                self._silence_start = block_time
+                
+        return checked_position
+        
+    def _read_last(self, n_samples):
+        """
+        Retorna uma cópia contígua das últimas n_samples amostras do buffer circular.
+        
+        Args:
+            n_samples: Número de amostras desejado (limitado ao que foi gravado)
+            
+        Returns:
+            np.ndarray: Array int16, da amostra mais antiga para a mais recente
+        """
+        # A posição é lida uma única vez, antes dos dados
+        total = self._total_written
+        return self._read_range(total - n_samples, total)
+        
+    def _read_range(self, start, end, copy=True):
+        """
+        Retorna uma cópia contígua das amostras entre as posições [start, end).
+        
+        As posições são contadas desde o início da gravação (ver _total_written); o
+        trecho é limitado aos últimos MAX_HISTORY_SECONDS antes de end.
+        
+        Args:
+            start: Posição absoluta inicial
+            end: Posição absoluta final (exclusiva), já publicada pelo callback
+            copy: Se False, retorna uma visão do buffer quando os dados são contíguos;
+                  só é seguro se o trecho for consumido antes de ser sobrescrito
+            
+        Returns:
+            np.ndarray: Array int16, da amostra mais antiga para a mais recente
+        """
+        start = max(start, end - self._history_samples, 0)
+        n_samples = max(end - start, 0)
+        size = len(self._ring)
+        first = start & self._ring_mask
+        last = first + n_samples
+        if last <= size:
+            view = self._ring[first:last]
+            return view.copy() if copy else view
+        # Dados atravessam o fim do buffer: junta as duas fatias em uma única cópia
+        return np.concatenate((self._ring[first:], self._ring[:last - size]))
         
     def _audio_callback(self, in_data, frame_count, time_info, status):
         """
@@ -114,26 +223,23 @@ class StreamRecorder:
             return None, pyaudio.paComplete
             
         try:
-            # Converte os bytes para float32 para processamento de alta qualidade
-            audio_data = np.frombuffer(in_data, dtype=np.int16).astype(np.float32) / 32768.0
+            # Visão somente leitura dos bytes entregues pelo PortAudio
+            audio_data = np.frombuffer(in_data, dtype=np.int16)
             
-            # Adiciona ao buffer acumulado com sincronização
-            with self._audio_buffer_lock:
-                self._accumulated_buffer = np.append(self._accumulated_buffer, audio_data)
-                
-            # Atualiza o estado de silêncio/fala
-            is_silence = self._detect_silence(audio_data)
-            current_time = time.time()
+            # Copia para o buffer circular com no máximo duas atribuições de fatia
+            size = len(self._ring)
+            if len(audio_data) > size:
+                audio_data = audio_data[-size:]
+            n = len(audio_data)
+            total = self._total_written
+            w = total & self._ring_mask
+            k1 = min(n, size - w)
+            np.copyto(self._ring[w:w + k1], audio_data[:k1])
+            np.copyto(self._ring[:n - k1], audio_data[k1:])
             
-            # Se mudamos de fala para silêncio, marca o início do silêncio
-            if not is_silence and not self._is_speech:
-                self._is_speech = True
-                self._speech_start = current_time
-                
-            # Se mudamos de silêncio para fala, marca o fim do silêncio
-            elif is_silence and self._is_speech:
-                self._is_speech = False
-                self._silence_start = current_time
+            # Publica a nova posição somente depois de escrever as amostras.
+            # A detecção de silêncio fica na thread de processamento (ver _update_speech_state)
+            self._total_written = total + n
                 
         except Exception as e:
             logger.error(f"Erro no callback de áudio: {str(e)}")
@@ -145,28 +251,38 @@ class StreamRecorder:
         e enviar para transcrição."""
 
         last_position = 0
+        checked_position = 0  # Áudio já analisado pela detecção de silêncio
         min_audio_length = 1.5  # segundos (reduzido para maior responsividade)
         min_samples = int(min_audio_length * self.sample_rate)
         force_process_interval = 5.0  # segundos
-        last_process_time = time.time()
+        last_process_time = time.monotonic()
         
-        # Aumenta o tamanho do buffer para manter mais contexto
-        max_buffer_size = int(60 * self.sample_rate)  # 60 segundos de áudio
-        overlap_samples = int(2.0 * self.sample_rate)  # 2 segundos de sobreposição
+        # O buffer circular mantém MAX_HISTORY_SECONDS de áudio como contexto
+        max_buffer_size = self._history_samples
+        
+        # Funções usadas a cada iteração, resolvidas uma única vez como variáveis locais
+        now = time.monotonic  # Relógio monotônico: imune a ajustes do relógio do sistema
+        stopped = self._stop_event.is_set
+        # Espera interrompível: retorna True assim que stop() sinaliza o evento
+        wait_stop = self._stop_event.wait
+        update_speech_state = self._update_speech_state
+        read_last = self._read_last
+        transcribe_stream = self.transcriber.transcribe_stream
 
-        while not self._stop_event.is_set():
-            # Copia dados atuais do buffer para processamento
-            with self._audio_buffer_lock:
-                if len(self._accumulated_buffer) == 0:
-                    time.sleep(0.1)
-                    continue
-                    
-                audio_buffer = np.copy(self._accumulated_buffer)
-                current_position = len(audio_buffer)
+        while not stopped():
+            # Posição atual da gravação (atributo relido a cada iteração, pois o
+            # callback a atualiza); o áudio só é copiado se for processado
+            current_position = self._total_written
+            if current_position == 0:
+                if wait_stop(0.1):
+                    break
+                continue
+                
+            checked_position = update_speech_state(checked_position, current_position)
                 
             # Calcula quanto áudio novo temos desde o último processamento
             new_samples = current_position - last_position
-            current_time = time.time()
+            current_time = now()
             time_since_last_process = current_time - last_process_time
             
             # Verificação de pausas naturais na fala
@@ -201,19 +317,19 @@ class StreamRecorder:
                 logger.debug("Processamento forçado por tempo limite")
             
             if should_process:
-                # Limita o tamanho do buffer, mas mantém sobreposição
-                if len(audio_buffer) > max_buffer_size:
-                    # Mantém os últimos N segundos + sobreposição para contexto
-                    audio_buffer = audio_buffer[-(max_buffer_size):]
+                # Últimos MAX_HISTORY_SECONDS de áudio (ou tudo, se a gravação for mais curta)
+                # convertidos para float32 uma única vez, já no buffer reutilizado
+                pcm = read_last(max_buffer_size)
+                audio_buffer = int16_to_float32(pcm, out=self._float_buffer[:len(pcm)])
                 
                 # Requisita transcrição do áudio atual (com contexto acumulado)
-                _, transcription = self.transcriber.transcribe_stream(
+                _, transcription = transcribe_stream(
                     audio_buffer, 
                     accumulate=True  # Garante que o contexto seja mantido
                 )
                 
                 last_position = current_position
-                last_process_time = time.time()
+                last_process_time = now()
                 
                 # Processa o resultado da transcrição
                 if transcription and self.on_transcription:
@@ -226,9 +342,10 @@ class StreamRecorder:
                 if not self._is_speech:
                     self._silence_start = 0
                 if self._is_speech:
-                    self._speech_start = time.time()  # Reinicia o contador de fala
+                    self._speech_start = now()  # Reinicia o contador de fala
             
-            time.sleep(0.05)  # Reduzido para maior responsividade
+            if wait_stop(0.05):  # Reduzido para maior responsividade
+                break
     
     def start(self):
         """
@@ -246,7 +363,7 @@ class StreamRecorder:
             
             # Configura e abre o stream de áudio
             self._stream = self._pyaudio.open(
-                format=pyaudio.paInt16,
+                format=SAMPLE_FORMAT,
                 channels=self.channels,
                 rate=self.sample_rate,
                 input=True,
@@ -258,9 +375,9 @@ class StreamRecorder:
             # Prepara para iniciar
             self._stop_event.clear()
             
-            # Inicializa buffer vazio
-            with self._audio_buffer_lock:
-                self._accumulated_buffer = np.array([], dtype=np.float32)
+            # Reinicia o buffer circular (o conteúdo antigo é ignorado pelas posições).
+            # O stream ainda não foi iniciado, então o callback não concorre com esta escrita
+            self._total_written = 0
             
             # Limpa contexto de transcrição para nova sessão
             self.transcriber.clear_stream_context()
@@ -269,7 +386,7 @@ class StreamRecorder:
             self._is_speech = False
             self._silence_start = 0
             self._speech_start = 0
-            self._last_process_time = time.time()
+            self._last_process_time = time.monotonic()
             
             # Inicia thread de processamento
             self._process_thread = threading.Thread(
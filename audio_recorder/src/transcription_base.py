@@ -3,44 +3,95 @@
 # Define interfaces, funções comuns e funções de conveniência
 
 import os
+import math
 import wave
 import abc
 import sys
-import librosa
 import numpy as np
 import logging
 import time
 import io
 from pathlib import Path
 import tempfile
+import hashlib
+import importlib.util
+import threading
+import multiprocessing
+from collections import OrderedDict
 from datetime import datetime
 
+# xxhash é opcional: bem mais rápido que hashlib para chaves de cache (não criptográficas)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# librosa é opcional: usado como alternativa de reamostragem quando não há scipy
+try:
+    import librosa
+    LIBROSA_AVAILABLE = True
+except ImportError:
+    LIBROSA_AVAILABLE = False
+
+# numba é opcional: compila a conversão int16 -> float32 em um laço SIMD paralelo
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# scipy é opcional: resample_poly (FIR polifásico) converte a taxa de amostragem em memória
+try:
+    from scipy.signal import resample_poly
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# silero-vad é opcional: detector de voz neural, usado para não descartar fala em volume baixo.
+# Só é importado no primeiro uso (ver _get_silero_model), porque importá-lo carrega o torch
+SILERO_AVAILABLE = importlib.util.find_spec("silero_vad") is not None
+
 # Adiciona o diretório raiz ao caminho de busca para importar constants
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from constants import (
+    SAMPLE_RATE,       # Taxa de amostragem nativa do Whisper (16kHz)
     SEGMENT_LENGTH,    # Duração de cada segmento para processamento (segundos)
+    RECORDING_GROUP_SECONDS, # Duração máxima de um grupo de trechos transcritos juntos
+    RECORDING_BATCH_SIZE, # Segmentos da gravação transcritos em uma única passada
     TEMP_DIR,          # Diretório para arquivos temporários
-    DEFAULT_OUTPUT_WAV # Caminho padrão para o arquivo WAV de saída
+    DEFAULT_OUTPUT_WAV, # Caminho padrão para o arquivo WAV de saída
+    TRANSCRIBE_CACHE_SIZE, # Tamanho do cache de transcrições
+    PREPARED_AUDIO_CACHE_SIZE, # Tamanho do cache de áudio convertido e períodos de fala
+    TRANSCRIBER_BACKEND, # Backend usado pelo transcritor padrão
+    INFERENCE_PROCESS, # Se o transcritor padrão roda em um processo separado
+    SILENCE_RMS_THRESHOLD, # Energia abaixo da qual o áudio é candidato a silêncio
+    PROMPT_CONTEXT_CHARS # Tamanho máximo do contexto passado como prompt
 )
 
-# Removendo a importação circular
-# from whisper_transcriber import WhisperTranscriber
-
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("transcription_base")
 
-# Vamos mover a inicialização do transcritor para depois da definição da classe
-# default_transcriber = WhisperTranscriber()
+# Transcritor padrão, criado sob demanda por get_default_transcriber: importar este
+# módulo não carrega nenhum modelo (nem importa o backend, evitando o import circular)
+default_transcriber = None
+_default_transcriber_lock = threading.Lock()
 
 class AudioTranscriber(abc.ABC):
     """
     Classe base abstrata para transcritores de áudio.
     
     Qualquer novo transcritor deve herdar desta classe e implementar
-    o método transcribe_file.
+    o método transcribe_file. Transcritores que aceitam arrays diretamente
+    implementam também _generate, usado pelas versões padrão de transcribe
+    e transcribe_frames.
     """
     
+    # Verdadeiro quando transcribe_batch processa os trechos juntos (uma passada do
+    # modelo ou chamadas simultâneas), e não apenas um a um
+    supports_batch = False
+    
     @abc.abstractmethod
     def transcribe_file(self, file_path: str, initial_prompt: str = None) -> str:
         """
@@ -55,6 +106,179 @@ class AudioTranscriber(abc.ABC):
         """
         pass
     
+    def _generate(self, audio: np.ndarray, initial_prompt: str = None, final: bool = False) -> str:
+        """
+        Transcreve um array float32 mono a 16kHz.
+        
+        Parâmetros:
+            audio (np.ndarray): Áudio a transcrever
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            final (bool): Transcrição final (arquivo ou gravação completa), em que o backend
+                          pode usar beam search; False nas janelas do streaming
+            
+        Retorna:
+            str: Texto transcrito
+        """
+        raise NotImplementedError
+    
+    def transcribe(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
+        """
+        Transcreve áudio em memória com _generate.
+        
+        Args:
+            audio: Array numpy int16 ou float (amostras x canais, se houver mais de um canal)
+            sample_rate: Taxa de amostragem do áudio
+            
+        Returns:
+            Texto transcrito
+        """
+        try:
+            audio = np.asarray(audio)
+            channels = audio.shape[1] if audio.ndim > 1 else 1
+            if audio.dtype == np.int16:
+                audio = to_whisper_audio(audio.reshape(-1), sample_rate, channels)
+            else:
+                if channels > 1:
+                    audio = audio.mean(axis=1, dtype=np.float32)
+                audio = resample_to_whisper(audio.astype(np.float32, copy=False), sample_rate)
+                
+            start_time = time.time()
+            text = self._generate(audio)
+            logger.info(f"Transcrição concluída em {time.time() - start_time:.2f} segundos")
+            return text
+        except Exception as e:
+            logger.error(f"Erro na transcrição: {e}")
+            return f"[ERRO: {str(e)}]"
+    
+    def transcribe_frames(self, frames, rate: int, channels: int, sample_width: int,
+                          initial_prompt: str = None, start_sample: int = None) -> str:
+        """
+        Transcreve frames PCM em memória.
+        
+        Com _generate implementado, frames de 16 bits são convertidos e transcritos direto
+        da memória (janelas do streaming, com start_sample, sem beam search). Nos demais
+        casos grava um WAV temporário e usa transcribe_file.
+        
+        Parâmetros:
+            frames: Array int16 intercalado ou lista de buffers de áudio
+            rate (int): Taxa de amostragem dos frames
+            channels (int): Número de canais
+            sample_width (int): Largura da amostra em bytes
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            start_sample (int, opcional): Posição absoluta (intercalada) dos frames na gravação;
+                                          permite reaproveitar o trecho sobreposto com a janela anterior
+            
+        Retorna:
+            str: Texto transcrito
+        """
+        if sample_width == 2 and type(self)._generate is not AudioTranscriber._generate:
+            try:
+                audio = to_whisper_audio(frames_to_pcm(frames), rate, channels)
+                return self._generate(audio, initial_prompt, final=start_sample is None)
+            except Exception as e:
+                logger.error(f"Erro ao transcrever frames: {e}")
+                return f"[ERRO DE TRANSCRIÇÃO: {str(e)}]"
+                
+        os.makedirs(TEMP_DIR, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=".wav", dir=TEMP_DIR)
+        os.close(fd)
+        try:
+            save_frames_to_wav(frames, path, rate, channels, sample_width)
+            return self.transcribe_file(path, initial_prompt=initial_prompt)
+        finally:
+            os.remove(path)
+    
+    def prepare_frames(self, frames, rate: int, channels: int, sample_width: int,
+                       start_sample: int = None) -> dict:
+        """
+        Etapa de pré-processamento de transcribe_frames, separada para rodar em outra thread.
+        
+        Transcritores que convertem o áudio ou calculam atributos (mel-espectrograma)
+        antes do modelo fazem isso aqui, de forma que o trabalho de CPU do próximo
+        segmento se sobreponha à inferência do segmento atual. A implementação padrão
+        apenas guarda os argumentos.
+        
+        Parâmetros:
+            frames: Array int16 intercalado ou lista de buffers de áudio
+            rate (int): Taxa de amostragem dos frames
+            channels (int): Número de canais
+            sample_width (int): Largura da amostra em bytes
+            start_sample (int, opcional): Posição absoluta (intercalada) dos frames na gravação
+            
+        Retorna:
+            dict: Segmento preparado, a ser passado para transcribe_prepared
+        """
+        return {"frames": frames, "rate": rate, "channels": channels,
+                "sample_width": sample_width, "start_sample": start_sample}
+    
+    def transcribe_prepared(self, prepared: dict, initial_prompt: str = None) -> str:
+        """
+        Transcreve um segmento retornado por prepare_frames.
+        
+        Parâmetros:
+            prepared (dict): Segmento preparado
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            
+        Retorna:
+            str: Texto transcrito
+        """
+        return self.transcribe_frames(
+            prepared["frames"], prepared["rate"], prepared["channels"], prepared["sample_width"],
+            initial_prompt=initial_prompt, start_sample=prepared["start_sample"]
+        )
+    
+    def transcribe_files(self, file_paths, initial_prompt: str = None) -> list:
+        """
+        Transcreve vários arquivos de áudio.
+        
+        Se o transcritor processa lotes (supports_batch), não há prompt e RECORDING_BATCH_SIZE
+        é maior que 1, os WAVs PCM de 16 bits de até 30s e com fala são lidos em memória e
+        transcritos em lotes, numa passada do modelo por lote. Os demais arquivos (longos,
+        em silêncio, em outros formatos ou que sobrariam sozinhos num lote) usam
+        transcribe_file, um a um.
+        
+        Parâmetros:
+            file_paths (list): Caminhos dos arquivos de áudio
+            initial_prompt (str, opcional): Texto inicial para dar contexto a cada arquivo
+            
+        Retorna:
+            list: Textos transcritos, na mesma ordem dos arquivos
+        """
+        texts = [None] * len(file_paths)
+        
+        if self.supports_batch and not initial_prompt and RECORDING_BATCH_SIZE > 1:
+            loaded = []
+            silence_rms = SILENCE_RMS_THRESHOLD / 32768.0
+            for i, path in enumerate(file_paths):
+                audio = load_wav_audio(path) if os.path.exists(path) else None
+                # Arquivos longos precisam do laço de janelas do transcribe_file, e os em
+                # silêncio são descartados pelo gate dele sem passar pelo modelo
+                if (audio is not None and 0 < len(audio) <= 30 * SAMPLE_RATE
+                        and np.sqrt(np.dot(audio, audio) / len(audio)) >= silence_rms):
+                    loaded.append((i, audio))
+                    
+            for b in range(0, len(loaded), RECORDING_BATCH_SIZE):
+                batch = loaded[b:b + RECORDING_BATCH_SIZE]
+                if len(batch) < 2:
+                    continue
+                for (i, _), text in zip(batch, self.transcribe_batch([audio for _, audio in batch], SAMPLE_RATE)):
+                    texts[i] = text
+                    
+        return [
+            text if text is not None else self.transcribe_file(path, initial_prompt=initial_prompt)
+            for path, text in zip(file_paths, texts)
+        ]
+    
+    def set_language(self, language_code: str):
+        """Define o idioma para transcrição."""
+        self.language = language_code
+        logger.info(f"Idioma definido: {language_code}")
+        
+    def set_translation(self, translate: bool):
+        """Define se deve traduzir para inglês."""
+        self.translate = translate
+        logger.info(f"Tradução: {'ativada' if translate else 'desativada'}")
+    
     def transcribe_from_recorder(self, recorder, output_wav: str = DEFAULT_OUTPUT_WAV, 
                                 segment_length: int = SEGMENT_LENGTH) -> str:
         """
@@ -68,40 +292,51 @@ class AudioTranscriber(abc.ABC):
         Retorna:
             str: Transcrição completa dividida por segmentos
         """
-        import logging
-        
-        try:
-            import librosa
-            import numpy as np
-            LIBROSA_AVAILABLE = True
-        except ImportError:
-            LIBROSA_AVAILABLE = False
-            import wave
-            import numpy as np
-        
         logger = logging.getLogger("Transcriber")
         
         # Determina a largura da amostra (sample width) a partir do gravador
         sample_width = recorder.audio.get_sample_size(recorder.fmt)
         
-        # Obtém uma cópia segura dos frames atuais
-        frames = recorder.get_frames()
+        # Obtém uma cópia segura do áudio atual como um único array int16
+        if hasattr(recorder, "get_audio"):
+            pcm = recorder.get_audio()
+        else:
+            pcm = frames_to_pcm(recorder.get_frames())
         
-        if not frames:
+        if len(pcm) == 0:
             logger.warning("Não há frames para transcrever")
             return "Não há áudio para transcrever."
         
-        # Salva todos os frames em um único arquivo WAV
+        # Salva todos os frames em um único arquivo WAV (apenas como registro da gravação;
+        # a transcrição abaixo usa o áudio já em memória)
         save_frames_to_wav(
-            frames,
+            pcm,
             output_wav,
             recorder.rate,
             recorder.channels,
             sample_width
         )
         
-        # Prepara lista para armazenar textos de cada segmento
-        segments_text = []
+        # Converte para 16kHz mono (formato nativo do Whisper) uma única vez, em memória,
+        # para que os segmentos não precisem ser reamostrados pelo ffmpeg um a um
+        rate = recorder.rate
+        channels = recorder.channels
+        y = None
+        non_silent_intervals = None
+        
+        # Retranscrever a mesma gravação reaproveita a conversão e a detecção de fala
+        prepared_key = _audio_hash(pcm, rate, channels, sample_width)
+        prepared = _prepared_cache_get(prepared_key)
+        if prepared is not None:
+            logger.info("Áudio convertido e períodos de fala obtidos do cache")
+            pcm, y, rate, channels, sample_width, non_silent_intervals = prepared
+        elif rate != SAMPLE_RATE or channels != 1:
+            logger.info(f"Convertendo áudio de {rate}Hz/{channels} canais para {SAMPLE_RATE}Hz mono")
+            y = to_whisper_audio(pcm, rate, channels)
+            pcm = np.clip(y * 32768.0, -32768, 32767).astype(np.int16)
+            rate = SAMPLE_RATE
+            channels = 1
+            sample_width = 2
         
         # Tamanho de segmento curto para melhor precisão (6 segundos)
         smaller_segment_length = 6  # segundos
@@ -111,301 +346,202 @@ class AudioTranscriber(abc.ABC):
         
         use_silence_detection = False
         
-        # Tente usar librosa para detecção de silêncio se disponível
-        if LIBROSA_AVAILABLE:
-            try:
-                # Carregar o áudio completo usando librosa
-                y, sr = librosa.load(output_wav, sr=None)
-                logger.info(f"Áudio carregado: {len(y)/sr:.2f} segundos a {sr}Hz")
-                
-                # Detecta períodos de silêncio para segmentação inteligente
-                non_silent_intervals = librosa.effects.split(
+        # Detecção de silêncio em NumPy puro (split_nonsilent), sem depender do librosa
+        try:
+            # Usa o áudio em memória (mono, float32) em vez de decodificar o WAV salvo
+            sr = rate
+            if y is None:
+                y = int16_to_float32(pcm)
+            logger.info(f"Áudio carregado: {len(y)/sr:.2f} segundos a {sr}Hz")
+            
+            # Detecta períodos de silêncio para segmentação inteligente
+            if non_silent_intervals is None:
+                non_silent_intervals = split_nonsilent(
                     y, 
                     top_db=36,       # Limiar de dB para considerar como silêncio (menos agressivo)
                     frame_length=512,  # Comprimento de janela para análise
                     hop_length=128     # Tamanho de salto entre janelas
                 )
-                
-                # Se não foi possível detectar períodos sem silêncio, use a abordagem padrão
-                if len(non_silent_intervals) == 0:
-                    logger.info("Não foi possível detectar períodos de fala - usando segmentação fixa")
-                    use_silence_detection = False
-                else:
-                    logger.info(f"Detectados {len(non_silent_intervals)} períodos de fala")
-                    use_silence_detection = True
-                    
-            except Exception as e:
-                logger.error(f"Erro ao processar áudio para detecção de silêncio: {e}")
-                use_silence_detection = False
-        else:
-            logger.info("Librosa não disponível - usando segmentação fixa")
-            
-        # Abre o arquivo WAV completo para leitura
-        with wave.open(output_wav, 'rb') as wf:
-            # Obtém propriedades do arquivo WAV
-            rate = wf.getframerate()       # Taxa de amostragem
-            channels = wf.getnchannels()   # Número de canais
-            sw = wf.getsampwidth()         # Largura da amostra
-            n_frames = wf.getnframes()     # Número total de frames
-            audio_duration = n_frames / rate  # Duração total em segundos
+                _prepared_cache_put(
+                    prepared_key,
+                    (pcm, y, rate, channels, sample_width, non_silent_intervals)
+                )
             
-            logger.info(f"Arquivo WAV: {audio_duration:.2f}s, {rate}Hz, {channels} canais")
+            # Se não foi possível detectar períodos sem silêncio, use a abordagem padrão
+            if len(non_silent_intervals) == 0:
+                logger.info("Não foi possível detectar períodos de fala - usando segmentação fixa")
+                use_silence_detection = False
+            else:
+                logger.info(f"Detectados {len(non_silent_intervals)} períodos de fala")
+                use_silence_detection = True
+                
+        except Exception as e:
+            logger.error(f"Erro ao processar áudio para detecção de silêncio: {e}")
+            use_silence_detection = False
             
-            # Contexto para manter continuidade entre segmentos
-            context = None
-            full_text_so_far = ""
+        # Propriedades do áudio em memória (o WAV não é relido do disco)
+        sw = sample_width              # Largura da amostra
+        n_frames = len(pcm) // channels  # Número total de frames
+        audio_duration = n_frames / rate  # Duração total em segundos
+        
+        def read_frames(start_frame, count):
+            """Retorna uma visão (sem cópia) de count frames PCM a partir de start_frame."""
+            return pcm[start_frame * channels:(start_frame + count) * channels]
+        
+        logger.info(f"Áudio em memória: {audio_duration:.2f}s, {rate}Hz, {channels} canais")
+        
+        # Contexto para manter continuidade entre segmentos
+        context = None
+        # Texto completo acumulado, escrito incrementalmente em vez de concatenado
+        full_text = io.StringIO()
+        
+        # Processa o áudio em segmentos: (frame inicial, número de frames, se pode ser
+        # retentado com mais áudio ao redor quando não produzir texto)
+        segment_count = 0
+        segments = []
+        raw_segments = []
+        
+        # Se temos detecção de silêncio, use-a para segmentação inteligente
+        if use_silence_detection:
+            # Mescla intervalos próximos, expande os muito curtos, divide os longos em
+            # partes sobrepostas e agrupa o resultado em trechos contínuos (ver plan_segments)
+            processed_intervals = plan_segments(
+                non_silent_intervals,
+                len(y),
+                sr,
+                segment_samples=int(smaller_segment_length * sr),
+                overlap_samples=int(overlap_seconds * sr),
+                max_gap=int(0.3 * sr),  # 300ms de silêncio máximo para considerar como mesmo segmento
+                group_samples=int(RECORDING_GROUP_SECONDS * sr)
+            )
             
-            # Processa o áudio em segmentos
-            segment_count = 0
-            raw_segments = []
+            logger.info(f"Segmentação final: {len(processed_intervals)} segmentos para processar")
             
-            # Se temos detecção de silêncio com librosa, use-a para segmentação inteligente
-            if use_silence_detection:
-                # O código de detecção de silêncio é mantido aqui para quando librosa estiver disponível
-                # Processa cada intervalo não silencioso com overlaps
-                processed_intervals = []
-                
-                # Agrupa intervalos próximos para evitar segmentos muito curtos
-                merged_intervals = []
-                current_interval = None
+            # Processa cada segmento
+            for i, (start_sample, end_sample) in enumerate(processed_intervals):
+                segment_count += 1
                 
-                max_gap = int(0.3 * sr)  # 300ms de silêncio máximo para considerar como mesmo segmento
+                # Converte amostras para frames do arquivo WAV
+                start_frame = int((start_sample / sr) * rate)
+                num_frames = int(((end_sample - start_sample) / sr) * rate)
                 
-                # Mescla intervalos que estão muito próximos
-                for interval in non_silent_intervals:
-                    if current_interval is None:
-                        current_interval = interval
-                    else:
-                        # Se o intervalo atual está próximo do próximo, mescle-os
-                        if interval[0] - current_interval[1] <= max_gap:
-                            current_interval[1] = interval[1]
-                        else:
-                            merged_intervals.append(current_interval)
-                            current_interval = interval
+                # Garante que não ultrapassamos o limite do arquivo
+                start_frame = max(0, start_frame)
+                num_frames = min(num_frames, n_frames - start_frame)
                 
-                # Adiciona o último intervalo
-                if current_interval is not None:
-                    merged_intervals.append(current_interval)
+                # Calcula a duração exata deste segmento
+                segment_duration = num_frames / rate
+                logger.info(f"Segmento {segment_count}: {segment_duration:.2f}s")
                 
-                logger.info(f"Após mesclagem: {len(merged_intervals)} segmentos de fala")
+                # Pula segmentos extremamente curtos (menos de 0.5 segundos)
+                if segment_duration < 0.5:
+                    logger.info(f"Segmento {segment_count} muito curto, pulando")
+                    continue
                 
-                # Divide intervalos longos em partes menores com sobreposição
-                for interval in merged_intervals:
-                    start_sample, end_sample = interval
-                    interval_duration = (end_sample - start_sample) / sr
-                    
-                    # Se o intervalo for muito curto, expanda-o um pouco
-                    if interval_duration < 1.0:  # Menos de 1 segundo
-                        padding = int(0.5 * sr)  # Adiciona 500ms de cada lado
-                        start_sample = max(0, start_sample - padding)
-                        end_sample = min(len(y), end_sample + padding)
-                        interval_duration = (end_sample - start_sample) / sr
-                    
-                    # Se o intervalo for mais longo que o tamanho de segmento, divida-o
-                    if interval_duration > smaller_segment_length:
-                        # Calcula quantos segmentos completos cabem neste intervalo
-                        segment_samples = int(smaller_segment_length * sr)
-                        overlap_samples = int(overlap_seconds * sr)
-                        step = segment_samples - overlap_samples
-                        
-                        # Divide o intervalo em segmentos sobrepostos
-                        for seg_start in range(start_sample, end_sample, step):
-                            seg_end = min(seg_start + segment_samples, end_sample)
-                            # Se o último segmento for muito curto, mescla com o anterior
-                            if (end_sample - seg_start) < (0.5 * segment_samples) and len(processed_intervals) > 0:
-                                processed_intervals[-1][1] = end_sample
-                            else:
-                                processed_intervals.append([seg_start, seg_end])
-                            
-                            # Evita segmentos muito curtos no final
-                            if seg_end >= end_sample - (0.5 * segment_samples):
-                                break
-                    else:
-                        # Intervalo curto, use-o diretamente
-                        processed_intervals.append([start_sample, end_sample])
-                
-                logger.info(f"Segmentação final: {len(processed_intervals)} segmentos para processar")
-                
-                # Processa cada segmento
-                for i, (start_sample, end_sample) in enumerate(processed_intervals):
-                    segment_count += 1
-                    
-                    # Converte amostras para frames do arquivo WAV
-                    start_frame = int((start_sample / sr) * rate)
-                    num_frames = int(((end_sample - start_sample) / sr) * rate)
-                    
-                    # Garante que não ultrapassamos o limite do arquivo
-                    start_frame = max(0, start_frame)
-                    num_frames = min(num_frames, n_frames - start_frame)
-                    
-                    # Posiciona o ponteiro de leitura
-                    wf.setpos(start_frame)
-                    
-                    # Lê o bloco de frames para este segmento
-                    frames_chunk = wf.readframes(num_frames)
-                    
-                    # Cria um nome para o arquivo temporário deste segmento
-                    seg_path = f"{TEMP_DIR}/{os.path.basename(output_wav).rstrip('.wav')}_seg{segment_count}.wav"
-                    
-                    # Salva este segmento como um arquivo WAV separado
-                    save_frames_to_wav([frames_chunk], seg_path, rate, channels, sw)
-                    
-                    # Calcula a duração exata deste segmento
-                    segment_duration = num_frames / rate
-                    logger.info(f"Segmento {segment_count}: {segment_duration:.2f}s")
-                    
-                    # Pula segmentos extremamente curtos (menos de 0.5 segundos)
-                    if segment_duration < 0.5:
-                        logger.info(f"Segmento {segment_count} muito curto, pulando")
-                        os.remove(seg_path)
-                        continue
-                    
-                    # Usa contexto aprimorado para transcrição
-                    seg_text = self.transcribe_file(seg_path, initial_prompt=context)
-                    
-                    # Se não obtivemos texto, tente aumentar a sensibilidade
-                    if not seg_text.strip() and segment_duration > 1.0:
-                        logger.info(f"Tentando novamente o segmento {segment_count} com configurações mais sensíveis")
-                        os.remove(seg_path)
-                        # Expande um pouco o segmento
-                        expanded_start = max(0, start_frame - int(0.5 * rate))
-                        expanded_frames = min(n_frames - expanded_start, num_frames + int(1.0 * rate))
-                        
-                        wf.setpos(expanded_start)
-                        frames_chunk = wf.readframes(expanded_frames)
-                        
-                        save_frames_to_wav([frames_chunk], seg_path, rate, channels, sw)
-                        
-                        # Tenta transcrever novamente
-                        seg_text = self.transcribe_file(seg_path, initial_prompt=context)
-                    
-                    # Armazena o texto bruto para pós-processamento
-                    raw_segments.append(seg_text)
-                    
-                    # Atualiza o contexto para o próximo segmento
-                    context = seg_text if seg_text.strip() else context
-                    
-                    # Atualiza o texto completo acumulado
-                    if seg_text.strip():
-                        if full_text_so_far:
-                            full_text_so_far += " " + seg_text
-                        else:
-                            full_text_so_far = seg_text
-                    
-                    # Remove o arquivo temporário do segmento após uso
-                    os.remove(seg_path)
+                segments.append((start_frame, num_frames, segment_duration > 1.0))
+        
+        else:
+            # Método tradicional com segmentos de tamanho fixo (quando não há períodos de fala)
+            # Calcula quantos frames correspondem a um segmento
+            segment_frames = rate * smaller_segment_length
+            
+            # Calcula quantos frames correspondem ao overlap
+            overlap_frames = rate * overlap_seconds
             
+            # Passos menores para segmentos menores com maior sobreposição
+            # Agora usando 75% de sobreposição para garantir continuidade
+            effective_step = int(segment_frames * 0.25)  # 75% overlap
+            
+            # O plano inteiro é calculado de uma vez, sem laço Python por segmento
+            planned = plan_fixed_segments(n_frames, rate, segment_frames, effective_step)
+            segments.extend(
+                (start_pos, frames_to_read, frames_to_read > rate * 2)
+                for start_pos, frames_to_read in planned.tolist()
+            )
+        
+        # Transcreve os segmentos direto da memória. Se o transcritor processa lotes, até
+        # RECORDING_BATCH_SIZE segmentos consecutivos passam juntos pelo modelo; dentro de
+        # um lote os segmentos são independentes (sem o contexto do anterior), e um lote
+        # de um único segmento é transcrito com o contexto acumulado
+        batch_size = max(1, RECORDING_BATCH_SIZE) if self.supports_batch else 1
+        for b in range(0, len(segments), batch_size):
+            batch = segments[b:b + batch_size]
+            if len(batch) > 1:
+                texts = self.transcribe_batch(
+                    [to_whisper_audio(read_frames(start, count), rate, channels) for start, count, _ in batch],
+                    SAMPLE_RATE
+                )
             else:
-                # Método tradicional com segmentos de tamanho fixo (funcionará sem librosa)
-                # Calcula quantos frames correspondem a um segmento
-                segment_frames = rate * smaller_segment_length
-                
-                # Calcula quantos frames correspondem ao overlap
-                overlap_frames = rate * overlap_seconds
+                start, count, _ = batch[0]
+                texts = [self.transcribe_frames(read_frames(start, count), rate, channels, sw, initial_prompt=context)]
                 
-                # Passos menores para segmentos menores com maior sobreposição
-                # Agora usando 75% de sobreposição para garantir continuidade
-                effective_step = int(segment_frames * 0.25)  # 75% overlap
+            for (start, count, can_retry), seg_text in zip(batch, texts):
+                # O texto sem espaços nas pontas é calculado uma vez e usado daqui em diante
+                seg_text = seg_text.strip()
                 
-                for i in range(0, n_frames, effective_step):
-                    segment_count += 1
-                    
-                    # Calcula a posição de início com overlap 
-                    # (exceto para o primeiro segmento)
-                    start_pos = max(0, i)
-                    
-                    # Calcula o número de frames a ler (com ajuste para não ultrapassar o fim do arquivo)
-                    frames_to_read = min(segment_frames, n_frames - start_pos)
-                    
-                    # Se o último segmento for muito curto, anexe-o ao anterior
-                    if frames_to_read < rate * 1.5 and segment_count > 1:  # Menos de 1.5 segundos
-                        logger.info(f"Último segmento muito curto ({frames_to_read/rate:.2f}s), pulando")
-                        continue
-                    
-                    # Posiciona o ponteiro de leitura no início do segmento atual
-                    wf.setpos(start_pos)
-                    
-                    # Lê o bloco de frames para este segmento
-                    frames_chunk = wf.readframes(frames_to_read)
-                    
-                    # Cria um nome para o arquivo temporário deste segmento
-                    seg_path = f"{TEMP_DIR}/{os.path.basename(output_wav).rstrip('.wav')}_seg{segment_count}.wav"
-                    
-                    # Salva este segmento como um arquivo WAV separado
-                    save_frames_to_wav([frames_chunk], seg_path, rate, channels, sw)
-                    
-                    # Tenta transcrever com contexto acumulado
-                    seg_text = self.transcribe_file(seg_path, initial_prompt=context)
-                    
-                    # Se não obtivemos texto, tente com configurações mais sensíveis
-                    # (adicionando um pouco mais de áudio antes e depois)
-                    if not seg_text.strip() and frames_to_read > rate * 2:
-                        extended_start = max(0, start_pos - int(rate * 0.5))
-                        extended_length = min(n_frames - extended_start, 
-                                             frames_to_read + int(rate * 1.0))
-                        
-                        # Remova o arquivo anterior e crie um novo estendido
-                        os.remove(seg_path)
-                        wf.setpos(extended_start)
-                        extended_frames = wf.readframes(extended_length)
-                        save_frames_to_wav([extended_frames], seg_path, rate, channels, sw)
-                        
-                        # Tente novamente a transcrição
-                        seg_text = self.transcribe_file(seg_path, initial_prompt=context)
-                    
-                    # Armazena o texto bruto para pós-processamento
-                    raw_segments.append(seg_text)
+                # Se não obtivemos texto, tente com configurações mais sensíveis
+                # (adicionando um pouco mais de áudio antes e depois). Sem contexto
+                # anterior a nova tentativa quase nunca produz texto, então é pulada
+                if not seg_text and can_retry and context:
+                    logger.info(f"Tentando novamente o segmento de {count / rate:.2f}s com mais áudio ao redor")
+                    expanded_start = max(0, start - int(0.5 * rate))
+                    expanded_frames = min(n_frames - expanded_start, count + int(1.0 * rate))
                     
+                    # Tenta transcrever novamente
+                    seg_text = self.transcribe_frames(
+                        read_frames(expanded_start, expanded_frames), rate, channels, sw, initial_prompt=context
+                    ).strip()
+                
+                # Armazena o texto para pós-processamento
+                raw_segments.append(seg_text)
+                
+                if seg_text:
                     # Atualiza o contexto para o próximo segmento
-                    context = seg_text if seg_text.strip() else context
+                    context = tail_context(seg_text)
                     
                     # Atualiza o texto completo acumulado
-                    if seg_text.strip():
-                        if full_text_so_far:
-                            full_text_so_far += " " + seg_text
-                        else:
-                            full_text_so_far = seg_text
+                    if full_text.tell():
+                        full_text.write(" ")
+                    full_text.write(seg_text)
+        
+        # Pós-processamento: Criar os segmentos finais com melhor fusão.
+        # O resultado é escrito direto no buffer de saída, sem uma lista intermediária
+        out = io.StringIO()
+        
+        # Cada segmento é dividido em palavras uma única vez; as sobreposições são
+        # comparadas como listas de palavras, sem remontar frases com join
+        word_lists = [text.split() for text in raw_segments]
+        
+        for i, text in enumerate(raw_segments):
+            words = word_lists[i]
+            if not words:
+                continue  # Pula segmentos vazios
+                
+            # Remove textos duplicados entre segmentos sobrepostos
+            if i > 0:
+                # Tenta identificar sobreposições de frases entre segmentos
+                prev_words = word_lists[i-1]
+                if not prev_words:
+                    continue
                     
-                    # Remove o arquivo temporário do segmento após uso
-                    os.remove(seg_path)
+                # Tenta diferentes tamanhos de sobreposição: o final do segmento
+                # anterior repetido no início do atual
+                for overlap_size in (8, 6, 4, 2):
+                    if len(prev_words) >= overlap_size and words[:overlap_size] == prev_words[-overlap_size:]:
+                        # Remove a parte sobreposta
+                        text = " ".join(words[overlap_size:])
+                        break
             
-            # Pós-processamento: Criar os segmentos finais com melhor fusão
-            processed_segments = []
-            
-            for i, text in enumerate(raw_segments):
-                if not text.strip():
-                    continue  # Pula segmentos vazios
-                    
-                # Remove textos duplicados entre segmentos sobrepostos
-                if i > 0:
-                    # Tenta identificar sobreposições de frases entre segmentos
-                    prev_text = raw_segments[i-1]
-                    if not prev_text.strip():
-                        continue
-                        
-                    # Tenta encontrar frases sobrepostas
-                    words = prev_text.split()
-                    
-                    # Tenta diferentes tamanhos de sobreposição
-                    for overlap_size in [8, 6, 4, 2]:
-                        if len(words) >= overlap_size:
-                            phrase = " ".join(words[-overlap_size:])
-                            if text.startswith(phrase):
-                                # Remove a parte sobreposta
-                                text = text[len(phrase):].strip()
-                                break
-                
-                # Adiciona o segmento processado
-                processed_segments.append(f"Segment {i+1}:\n{text}")
-        
-        # Combina todas as transcrições dos segmentos com separação por linhas em branco
-        if not processed_segments:
+            # Adiciona o segmento processado, separado do próximo por uma linha em branco
+            out.write(f"Segment {i+1}:\n{text}\n\n")
+    
+        if out.tell() == 0:
             return "Não foi possível transcrever o áudio."
-            
-        segmented_result = "\n\n".join(processed_segments)
         
         # Adiciona também a transcrição completa consolidada como alternativa
-        return f"{segmented_result}\n\n===== TRANSCRIÇÃO COMPLETA =====\n{full_text_so_far}"
+        out.write("===== TRANSCRIÇÃO COMPLETA =====\n")
+        out.write(full_text.getvalue())
+        return out.getvalue()
 
     def transcribe_microphone_realtime(self, recorder, chunk_duration: float = 2.0, callback = None):
         """
@@ -425,94 +561,8 @@ class AudioTranscriber(abc.ABC):
             Esta função não retorna diretamente o resultado, mas chama o callback
             fornecido com atualizações de texto a cada chunk processado.
         """
-        # Buffer para manter o stream de áudio contínuo
-        audio_stream = None
-        
-        # Timestamp do último processamento
-        last_process_time = time.time()
-        
-        # Função para processar chunks de áudio
-        def process_audio_chunk(frames, is_final=False):
-            nonlocal audio_stream, last_process_time
-            
-            current_time = time.time()
-            # Verifica se passamos tempo suficiente desde o último processamento
-            time_elapsed = current_time - last_process_time
-            
-            # Processa apenas a cada chunk_duration segundos ou se for o chunk final
-            if time_elapsed < chunk_duration and not is_final:
-                return
-                
-            # Atualiza o timestamp
-            last_process_time = current_time
-            
-            try:
-                # Verifica se temos frames para processar
-                if not frames or len(frames) == 0:
-                    logging.warning("Nenhum frame de áudio para processar")
-                    return
-                
-                # Abordagem simplificada para áudio mono
-                try:
-                    # 1. Criar um buffer de bytes único e converter para array numpy
-                    audio_bytes = b''.join(frames)
-                    audio_data = np.frombuffer(audio_bytes, dtype=np.int16)
-                    
-                    # 2. Verificar e ajustar o formato (estéreo para mono)
-                    if recorder.channels == 2:
-                        # Reorganizar para formato (n_samples, 2)
-                        samples_per_frame = len(audio_data) // len(frames)
-                        logging.info(f"Processando {len(frames)} frames, {samples_per_frame} amostras/frame")
-                        
-                        try:
-                            # Reshape e média para mono
-                            audio_data = audio_data.reshape(-1, 2)
-                            audio_data = np.mean(audio_data, axis=1)
-                            logging.info(f"Áudio estéreo convertido para mono: {audio_data.shape}")
-                        except Exception as reshape_error:
-                            logging.error(f"Erro ao converter estéreo para mono: {reshape_error}")
-                            # Fallback: usar apenas um canal
-                            audio_data = audio_data[::2]
-                            logging.info(f"Fallback: usando apenas o canal esquerdo: {audio_data.shape}")
-                    
-                    # 3. Normalizar para o intervalo [-1, 1]
-                    audio_float = audio_data.astype(np.float32) / 32768.0
-                    
-                    # 4. Garantir formato 1D consistente
-                    if len(audio_float.shape) > 1:
-                        audio_float = audio_float.flatten()
-                    
-                    # Acrescentar consistência extra: garantir tipo e formato corretos
-                    audio_float = np.ascontiguousarray(audio_float, dtype=np.float32)
-                    
-                    # Log dos detalhes do áudio para diagnóstico
-                    logging.info(f"Áudio preparado: shape={audio_float.shape}, "
-                                f"min={np.min(audio_float):.2f}, max={np.max(audio_float):.2f}")
-                    
-                    # 5. Processar o stream com tratamento de erros específico
-                    audio_stream, text = self.transcribe_stream(audio_float, audio_stream)
-                    
-                    # Chama o callback com o texto
-                    if callback and text:
-                        callback(text, is_final)
-                        
-                except RuntimeError as e:
-                    # Captura específica para o erro de tensor mismatch
-                    if "sizes of tensors must match" in str(e).lower():
-                        logging.error(f"Erro de dimensão: {e} - reiniciando stream")
-                        # Reiniciar o stream e processar apenas o chunk atual
-                        audio_stream = None
-                        audio_stream, text = self.transcribe_stream(audio_float, None)
-                        
-                        if callback and text:
-                            callback(text, is_final)
-                    else:
-                        raise e
-                
-            except Exception as e:
-                logging.error(f"Erro ao processar chunk de áudio: {e}")
-                if callback:
-                    callback(f"[ERRO: {str(e)}]", is_final)
+        # A conversão e a transcrição de cada chunk acontecem no próprio recorder
+        # (AudioRecorder._to_pooled_float); aqui só o callback é registrado
         
         # Teste do callback para garantir que a UI será atualizada
         if callback:
@@ -525,12 +575,388 @@ class AudioTranscriber(abc.ABC):
         # quando tiver chunks completos para transcrever
 
 
+# Fator de escala de int16 para float32 no intervalo [-1.0, 1.0)
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+# Abaixo deste tamanho o custo de disparar as threads do numba supera o ganho
+NUMBA_MIN_SAMPLES = 1 << 16
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _int16_to_float32_kernel(src, dst):
+        scale = np.float32(1.0 / 32768.0)
+        for i in numba.prange(src.shape[0]):
+            dst[i] = np.float32(src[i]) * scale
+
+def int16_to_float32(samples, out=None):
+    """
+    Converte amostras int16 para float32 normalizado em uma única passada.
+    
+    Funde o cast e a divisão (astype + / 32768.0) em uma só operação,
+    evitando o array temporário intermediário. Com numba disponível, arrays
+    grandes são convertidos por um kernel compilado e paralelo.
+    
+    Parâmetros:
+        samples (np.ndarray): Array numpy int16
+        out (np.ndarray, opcional): Array float32 (mesmo tamanho) para receber o resultado
+        
+    Retorna:
+        np.ndarray: Array float32 normalizado
+    """
+    if (NUMBA_AVAILABLE and isinstance(samples, np.ndarray) and samples.dtype == np.int16
+            and samples.ndim == 1 and len(samples) >= NUMBA_MIN_SAMPLES):
+        if out is None:
+            out = np.empty(len(samples), dtype=np.float32)
+        _int16_to_float32_kernel(samples, out)
+        return out
+    return np.multiply(samples, INT16_SCALE, out=out, dtype=np.float32)
+
+
+def frames_to_pcm(frames):
+    """
+    Converte frames de áudio em um único array int16.
+    
+    Um array numpy é devolvido como está; uma lista de buffers (bytes ou arrays)
+    é concatenada uma única vez, sem passar por b"".join.
+    
+    Parâmetros:
+        frames (np.ndarray | list): Array int16 ou lista de buffers de áudio
+        
+    Retorna:
+        np.ndarray: Array int16 intercalado
+    """
+    if isinstance(frames, np.ndarray):
+        return frames
+    if len(frames) == 0:
+        return np.zeros(0, dtype=np.int16)
+    return np.concatenate([np.frombuffer(frame, dtype=np.int16) for frame in frames])
+
+def to_whisper_audio(pcm, rate, channels):
+    """
+    Converte PCM int16 intercalado para float32 mono a 16kHz.
+    
+    Faz a média dos canais antes de reamostrar (a operação é linear, então o
+    resultado é o mesmo com menos amostras para filtrar) e reamostra com
+    resample_to_whisper.
+    
+    Parâmetros:
+        pcm (np.ndarray): Amostras int16 intercaladas
+        rate (int): Taxa de amostragem original
+        channels (int): Número de canais
+        
+    Retorna:
+        np.ndarray: Áudio float32 mono a SAMPLE_RATE
+    """
+    pcm = np.asarray(pcm)
+    if channels > 1:
+        audio = pcm[:len(pcm) - len(pcm) % channels].reshape(-1, channels).mean(axis=1, dtype=np.float32) * INT16_SCALE
+    else:
+        audio = int16_to_float32(pcm)
+    return resample_to_whisper(audio, rate)
+
+def resample_to_whisper(audio, rate):
+    """
+    Reamostra áudio float32 mono para SAMPLE_RATE.
+    
+    Usa o FIR polifásico do scipy; sem scipy, recorre ao librosa (ou a uma
+    interpolação linear).
+    
+    Parâmetros:
+        audio (np.ndarray): Áudio float32 mono
+        rate (int): Taxa de amostragem original
+        
+    Retorna:
+        np.ndarray: Áudio float32 mono a SAMPLE_RATE
+    """
+    if rate != SAMPLE_RATE:
+        if SCIPY_AVAILABLE:
+            audio = resample_poly(audio, SAMPLE_RATE, rate).astype(np.float32, copy=False)
+        elif LIBROSA_AVAILABLE:
+            audio = librosa.resample(audio, orig_sr=rate, target_sr=SAMPLE_RATE)
+        else:
+            # Interpolação linear simples (menos precisa)
+            n_out = int(round(len(audio) * SAMPLE_RATE / rate))
+            audio = np.interp(np.arange(n_out) * (rate / SAMPLE_RATE), np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+def split_nonsilent(y, top_db=36, frame_length=512, hop_length=128):
+    """
+    Encontra os trechos com som em um sinal, como o librosa.effects.split.
+    
+    A energia de cada janela (centrada, com preenchimento de zeros) é obtida da soma
+    acumulada dos quadrados, sem materializar as janelas sobrepostas; são trechos com
+    som as janelas a menos de top_db abaixo da janela mais forte.
+    
+    Parâmetros:
+        y (np.ndarray): Áudio float32 mono
+        top_db (float): Limiar em dB abaixo do pico para considerar silêncio
+        frame_length (int): Comprimento de cada janela de análise
+        hop_length (int): Salto entre janelas
+        
+    Retorna:
+        np.ndarray: Intervalos (N, 2) [início, fim) em amostras
+    """
+    y = np.asarray(y, dtype=np.float32)
+    n = len(y)
+    pad = frame_length // 2
+    n_windows = 1 + (n + 2 * pad - frame_length) // hop_length
+    if n == 0 or n_windows < 1:
+        return np.empty((0, 2), dtype=np.int64)
+        
+    # energy[k] = soma dos quadrados das k primeiras amostras do sinal preenchido
+    energy = np.zeros(n + 2 * pad + 1)
+    np.cumsum(np.square(y, dtype=np.float64), out=energy[pad + 1:pad + n + 1])
+    energy[pad + n + 1:] = energy[pad + n]
+    
+    starts = np.arange(n_windows) * hop_length
+    power = np.maximum(energy[starts + frame_length] - energy[starts], 0.0) / frame_length
+    
+    # Mesmo critério do power_to_db(ref=np.max) > -top_db, sem calcular logaritmos
+    threshold = max(power.max(), 1e-10) * 10.0 ** (-top_db / 10.0)
+    non_silent = np.maximum(power, 1e-10) > threshold
+    
+    # Bordas das sequências de janelas com som, convertidas para amostras
+    edges = np.flatnonzero(np.diff(non_silent.astype(np.int8))) + 1
+    if non_silent[0]:
+        edges = np.concatenate(([0], edges))
+    if non_silent[-1]:
+        edges = np.concatenate((edges, [n_windows]))
+    return np.minimum(edges * hop_length, n).reshape(-1, 2)
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _plan_segments_kernel(intervals, n_samples, sr, segment_samples, overlap_samples,
+                              max_gap, group_samples):
+        # Mesmo plano de plan_segments, em laços compilados e com saída pré-alocada
+        n = intervals.shape[0]
+        
+        # 1. Mescla intervalos separados por no máximo max_gap amostras
+        merged = np.empty((n, 2), dtype=np.int64)
+        k = 0
+        merged[0, 0] = intervals[0, 0]
+        merged[0, 1] = intervals[0, 1]
+        for i in range(1, n):
+            if intervals[i, 0] - merged[k, 1] <= max_gap:
+                merged[k, 1] = intervals[i, 1]
+            else:
+                k += 1
+                merged[k, 0] = intervals[i, 0]
+                merged[k, 1] = intervals[i, 1]
+        k += 1
+        
+        step = segment_samples - overlap_samples
+        padding = int(0.5 * sr)
+        out = np.empty((k + n_samples // step + 2, 2), dtype=np.int64)
+        m = 0
+        for i in range(k):
+            start = merged[i, 0]
+            end = merged[i, 1]
+            
+            # 2. Intervalos com menos de 1 segundo ganham 500ms de cada lado
+            if end - start < sr:
+                start = max(start - padding, 0)
+                end = min(end + padding, n_samples)
+                
+            # 3. Intervalos longos viram partes sobrepostas de segment_samples
+            parts = 1
+            is_long = end - start > segment_samples
+            if is_long:
+                parts = max(int(math.ceil((end - 1.5 * segment_samples - start) / step)), 0) + 1
+                
+            for j in range(parts):
+                part_start = start + j * step
+                part_end = min(part_start + segment_samples, end) if is_long else end
+                
+                # 4. Agrupa partes consecutivas em trechos contínuos de até group_samples
+                if m > 0 and part_end - out[m - 1, 0] <= group_samples:
+                    out[m - 1, 1] = max(out[m - 1, 1], part_end)
+                else:
+                    out[m, 0] = part_start
+                    out[m, 1] = part_end
+                    m += 1
+        return out[:m]
+
+def plan_segments(intervals, n_samples, sr, segment_samples, overlap_samples, max_gap, group_samples):
+    """
+    Converte os intervalos de fala detectados em trechos (início, fim) a transcrever.
+    
+    1. Mescla intervalos separados por no máximo max_gap amostras de silêncio
+    2. Expande em 500ms de cada lado os intervalos com menos de 1 segundo
+    3. Divide intervalos mais longos que segment_samples em partes sobrepostas
+    4. Agrupa partes consecutivas em trechos contínuos de até group_samples: o Whisper
+       processa janelas de 30s de qualquer forma, então cada grupo vira uma única
+       chamada; partes sobrepostas entram no mesmo grupo sem duplicar áudio
+    
+    Com numba disponível, o plano inteiro é calculado por um kernel compilado. Sem ele,
+    as etapas 1 a 3 são feitas com operações vetorizadas do NumPy, sem laços Python
+    por intervalo; só o agrupamento, que depende do grupo anterior, percorre as partes.
+    
+    Parâmetros:
+        intervals (np.ndarray): Intervalos (N, 2) em amostras, como os de split_nonsilent
+        n_samples (int): Número total de amostras do áudio
+        sr (int): Taxa de amostragem
+        segment_samples (int): Tamanho máximo de uma parte antes de ser dividida
+        overlap_samples (int): Sobreposição entre partes consecutivas
+        max_gap (int): Maior silêncio (em amostras) dentro de um mesmo intervalo
+        group_samples (int): Tamanho máximo de um grupo
+        
+    Retorna:
+        list: Lista de [início, fim] em amostras
+    """
+    intervals = np.ascontiguousarray(intervals, dtype=np.int64).reshape(-1, 2)
+    if len(intervals) == 0:
+        return []
+    if NUMBA_AVAILABLE:
+        return _plan_segments_kernel(
+            intervals, n_samples, sr, segment_samples, overlap_samples, max_gap, group_samples
+        ).tolist()
+        
+    # 1. Um novo intervalo começa onde o silêncio desde o anterior passa de max_gap
+    breaks = intervals[1:, 0] - intervals[:-1, 1] > max_gap
+    starts = intervals[np.r_[True, breaks], 0]
+    ends = intervals[np.r_[breaks, True], 1]
+    
+    # 2. Intervalos com menos de 1 segundo ganham 500ms de cada lado
+    short = ends - starts < sr
+    padding = int(0.5 * sr)
+    starts = np.where(short, np.maximum(starts - padding, 0), starts)
+    ends = np.where(short, np.minimum(ends + padding, n_samples), ends)
+    
+    # 3. Intervalos longos viram partes de segment_samples a cada step amostras; a última
+    #    parte é a primeira que chega a meio segmento do fim, evitando sobras curtas
+    step = segment_samples - overlap_samples
+    long = ends - starts > segment_samples
+    counts = np.where(
+        long,
+        np.maximum(np.ceil((ends - 1.5 * segment_samples - starts) / step), 0).astype(np.int64) + 1,
+        1
+    )
+    owner = np.repeat(np.arange(len(starts)), counts)
+    index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    part_starts = starts[owner] + index * step
+    part_ends = np.where(long[owner], np.minimum(part_starts + segment_samples, ends[owner]), ends[owner])
+    
+    # 4. Agrupa partes consecutivas em trechos contínuos de até group_samples
+    grouped = []
+    for start, end in zip(part_starts.tolist(), part_ends.tolist()):
+        if grouped and end - grouped[-1][0] <= group_samples:
+            grouped[-1][1] = max(grouped[-1][1], end)
+        else:
+            grouped.append([start, end])
+    return grouped
+
+def plan_fixed_segments(n_frames, rate, segment_frames, step):
+    """
+    Calcula os segmentos de tamanho fixo usados quando não há períodos de fala detectados.
+    
+    Um segmento de segment_frames começa a cada step frames; o último é truncado no fim
+    do áudio e descartado se ficar com menos de 1.5 segundos (exceto quando é o único).
+    
+    Parâmetros:
+        n_frames (int): Número total de frames do áudio
+        rate (int): Taxa de amostragem
+        segment_frames (int): Tamanho de cada segmento em frames
+        step (int): Distância entre inícios de segmentos consecutivos
+        
+    Retorna:
+        np.ndarray: Array (M, 2) de [frame inicial, número de frames]
+    """
+    starts = np.arange(0, n_frames, max(1, step), dtype=np.int64)
+    counts = np.minimum(segment_frames, n_frames - starts)
+    keep = counts >= rate * 1.5
+    keep[:1] = True
+    return np.column_stack((starts[keep], counts[keep]))
+
+def tail_context(text, max_chars=PROMPT_CONTEXT_CHARS):
+    """
+    Retorna o final de um texto para ser usado como prompt (contexto) da próxima transcrição.
+    
+    O Whisper só aproveita os últimos ~200 tokens do prompt; o restante apenas custa
+    tokenização. O corte é feito no início de uma palavra, para não começar o prompt
+    com uma palavra pela metade.
+    
+    Parâmetros:
+        text (str): Texto transcrito anteriormente
+        max_chars (int): Número máximo de caracteres mantidos
+        
+    Retorna:
+        str: Final do texto, com no máximo max_chars caracteres
+    """
+    if not text or len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    space = tail.find(" ")
+    return tail[space + 1:] if space >= 0 else tail
+
+def physical_cpu_count():
+    """
+    Estima o número de núcleos físicos da CPU.
+    
+    os.cpu_count() conta núcleos lógicos; com SMT de duas vias, metade deles são
+    hyperthreads que disputam as mesmas unidades de cálculo nas multiplicações de
+    matrizes da inferência.
+    
+    Retorna:
+        int: Metade dos núcleos lógicos (no mínimo 1)
+    """
+    return max(1, (os.cpu_count() or 2) // 2)
+
+_silero_model = None
+_silero_lock = threading.Lock()
+
+def _get_silero_model():
+    """Importa o silero-vad e carrega o modelo uma única vez, na primeira chamada."""
+    global _silero_model
+    with _silero_lock:
+        if _silero_model is None:
+            from silero_vad import load_silero_vad
+            _silero_model = load_silero_vad()
+    return _silero_model
+
+def is_silent(pcm, rate, channels=1):
+    """
+    Verifica se um trecho PCM int16 não contém fala.
+    
+    O teste de energia (RMS sobre os inteiros, sem converter para float) decide a
+    maioria dos casos sem custo. Trechos abaixo de SILENCE_RMS_THRESHOLD ainda passam
+    pelo silero-vad, quando disponível, para não descartar fala em volume baixo.
+    
+    Parâmetros:
+        pcm (np.ndarray): Amostras int16 intercaladas
+        rate (int): Taxa de amostragem
+        channels (int): Número de canais
+        
+    Retorna:
+        bool: True se o trecho pode ser ignorado
+    """
+    pcm = np.asarray(pcm)
+    if len(pcm) == 0:
+        return True
+    rms = np.sqrt(np.mean(np.square(pcm, dtype=np.int32), dtype=np.float64))
+    if rms >= SILENCE_RMS_THRESHOLD:
+        return False
+    if not SILERO_AVAILABLE:
+        return True
+        
+    try:
+        import torch
+        from silero_vad import get_speech_timestamps
+        model = _get_silero_model()
+        audio = torch.from_numpy(to_whisper_audio(pcm, rate, channels))
+        return not get_speech_timestamps(audio, model, sampling_rate=SAMPLE_RATE)
+    except Exception as e:
+        logging.getLogger("AudioTranscriber").warning(f"Falha no silero-vad, usando apenas o RMS: {e}")
+        return True
+
 def save_frames_to_wav(frames, path, rate, channels, sample_width):
     """
     Salva frames de áudio brutos em um arquivo WAV.
     
+    Um array numpy (ou outro buffer contíguo) é escrito de uma só vez, sem cópia;
+    uma lista de buffers é escrita bloco a bloco, sem concatená-los antes.
+    
     Parâmetros:
-        frames (list): Lista de buffers de áudio (bytes)
+        frames (np.ndarray | list): Array int16 intercalado ou lista de buffers de áudio
         path (str): Caminho onde o arquivo WAV será salvo
         rate (int): Taxa de amostragem do áudio (amostras por segundo)
         channels (int): Número de canais (1=mono, 2=estéreo)
@@ -539,37 +965,173 @@ def save_frames_to_wav(frames, path, rate, channels, sample_width):
     # Cria o diretório de destino se não existir
     os.makedirs(os.path.dirname(path), exist_ok=True)
     
-    # Abre o arquivo WAV para escrita em modo binário
-    with wave.open(path, "wb") as wf:
+    # Abre o arquivo WAV para escrita em modo binário, com um buffer de 1 MiB para que
+    # uma lista de muitos buffers pequenos vire poucas chamadas de escrita ao sistema
+    with open(path, "wb", buffering=1 << 20) as fp, wave.open(fp, "wb") as wf:
         wf.setnchannels(channels)       # Define número de canais (mono/estéreo)
         wf.setsampwidth(sample_width)   # Define tamanho das amostras em bytes
         wf.setframerate(rate)           # Define taxa de amostragem (Hz)
-        wf.writeframes(b"".join(frames)) # Escreve todos os frames concatenados
+        if isinstance(frames, (list, tuple)):
+            for frame in frames:
+                wf.writeframesraw(frame)  # O cabeçalho é corrigido ao fechar o arquivo
+        else:
+            wf.writeframes(np.ascontiguousarray(frames) if isinstance(frames, np.ndarray) else frames)
 
 
+def load_wav_audio(path):
+    """
+    Lê um arquivo WAV PCM de 16 bits direto para float32 mono a 16kHz, sem ffmpeg.
+    
+    Parâmetros:
+        path (str): Caminho do arquivo WAV
+        
+    Retorna:
+        np.ndarray | None: Áudio float32 mono a SAMPLE_RATE, ou None se o arquivo não for
+                           um WAV PCM de 16 bits (quem chama recorre a outro decodificador)
+    """
+    try:
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
+                return None
+            rate = wf.getframerate()
+            channels = wf.getnchannels()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+    except (wave.Error, EOFError):
+        return None
+    return to_whisper_audio(pcm, rate, channels)
+
 # ====== Funções e objetos anteriormente em audio_transcriber.py ======
 
 # Funções de conveniência para manter compatibilidade com código existente 
 # que usa a API anterior
 
-def get_default_transcriber():
+def create_transcriber(backend=TRANSCRIBER_BACKEND):
     """
-    Obtém a instância do transcritor padrão.
-    Importa o WhisperTranscriber aqui para evitar importação circular.
+    Cria um transcritor do backend indicado ("whisper", "faster-whisper", "openvino" ou "whisper.cpp").
+    Importa o transcritor aqui para evitar importação circular. Se o faster-whisper
+    não estiver instalado, recorre ao openai-whisper.
     """
+    if backend == "openvino":
+        from openvino_transcriber import OpenVINOWhisperTranscriber
+        return OpenVINOWhisperTranscriber()
+    elif backend == "whisper.cpp":
+        from whisper_cpp_transcriber import WhisperCppTranscriber
+        return WhisperCppTranscriber()
+    elif backend == "faster-whisper":
+        try:
+            from faster_whisper_transcriber import FasterWhisperTranscriber
+            return FasterWhisperTranscriber()
+        except ImportError as e:
+            logger.warning(f"faster-whisper não disponível ({e}), usando o openai-whisper")
+            
     from whisper_transcriber import WhisperTranscriber
+    return WhisperTranscriber()
+
+def get_default_transcriber():
+    """
+    Obtém a instância do transcritor padrão, conforme TRANSCRIBER_BACKEND.
+    Com INFERENCE_PROCESS, retorna um InferenceProcess que executa esse backend
+    em um processo filho.
+    
+    O modelo é carregado na primeira chamada; chamadas simultâneas de várias threads
+    esperam por esse único carregamento em vez de carregar o modelo mais de uma vez.
+    """
     global default_transcriber
     
-    if 'default_transcriber' not in globals() or default_transcriber is None:
-        default_transcriber = WhisperTranscriber()
+    if default_transcriber is not None:
+        return default_transcriber
+    with _default_transcriber_lock:
+        if default_transcriber is None:
+            if INFERENCE_PROCESS and multiprocessing.parent_process() is None:
+                from inference_process import InferenceProcess
+                default_transcriber = InferenceProcess(TRANSCRIBER_BACKEND)
+            else:
+                default_transcriber = create_transcriber(TRANSCRIBER_BACKEND)
         
     return default_transcriber
 
+# Cache LRU de transcrições, indexado pelo hash do áudio
+# Janelas sobrepostas e reenvios frequentemente repetem exatamente o mesmo áudio
+_transcribe_cache = OrderedDict()
+_transcribe_cache_lock = threading.Lock()
+
+def _audio_hash(data, *extra) -> bytes:
+    """
+    Calcula um hash rápido (não criptográfico) dos bytes de áudio e parâmetros extras.
+    
+    Parâmetros:
+        data: Objeto com interface de buffer (bytes, np.ndarray contíguo, ...)
+        *extra: Valores adicionais que influenciam o resultado (idioma, prompt, ...)
+        
+    Retorna:
+        bytes: Digest usado como chave do cache
+    """
+    h = xxhash.xxh3_64() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=16)
+    h.update(memoryview(data).cast("B"))
+    h.update(repr(extra).encode("utf-8"))
+    return h.digest()
+
+def _cache_get(key):
+    """Retorna a transcrição em cache para a chave, ou None se não existir."""
+    with _transcribe_cache_lock:
+        if key in _transcribe_cache:
+            _transcribe_cache.move_to_end(key)
+            logger.debug("Transcrição obtida do cache")
+            return _transcribe_cache[key]
+    return None
+
+def _cache_put(key, text):
+    """Armazena uma transcrição no cache, descartando as entradas mais antigas."""
+    # Não armazena mensagens de erro para permitir nova tentativa
+    if not text or text.startswith("[ERRO"):
+        return
+    with _transcribe_cache_lock:
+        _transcribe_cache[key] = text
+        _transcribe_cache.move_to_end(key)
+        while len(_transcribe_cache) > TRANSCRIBE_CACHE_SIZE:
+            _transcribe_cache.popitem(last=False)
+
+# Cache LRU do áudio já convertido para 16kHz mono e dos períodos de fala detectados,
+# indexado pelo hash da gravação original (poucas entradas: cada uma guarda o áudio inteiro)
+_prepared_cache = OrderedDict()
+_prepared_cache_lock = threading.Lock()
+
+def _prepared_cache_get(key):
+    """Retorna o áudio preparado em cache para a chave, ou None se não existir."""
+    with _prepared_cache_lock:
+        if key in _prepared_cache:
+            _prepared_cache.move_to_end(key)
+            return _prepared_cache[key]
+    return None
+
+def _prepared_cache_put(key, prepared):
+    """Armazena o áudio preparado, descartando as gravações mais antigas."""
+    with _prepared_cache_lock:
+        _prepared_cache[key] = prepared
+        _prepared_cache.move_to_end(key)
+        while len(_prepared_cache) > PREPARED_AUDIO_CACHE_SIZE:
+            _prepared_cache.popitem(last=False)
+
+def _cached_transcription(key, transcribe_fn) -> str:
+    """
+    Retorna a transcrição em cache para a chave ou executa transcribe_fn e armazena o resultado.
+    """
+    text = _cache_get(key)
+    if text is not None:
+        return text
+            
+    text = transcribe_fn()
+    _cache_put(key, text)
+    return text
+
 def transcribe_audio(file_path=None, initial_prompt=None, frames=None, sample_rate=None) -> str:
     """
     Transcreve um arquivo de áudio ou dados de áudio em frames usando o transcritor padrão.
     Função auxiliar para manter compatibilidade com código antigo.
     
+    Resultados são armazenados em um cache LRU indexado pelo hash do áudio,
+    evitando retranscrever exatamente o mesmo áudio.
+    
     Parâmetros:
         file_path (str, opcional): Caminho para o arquivo de áudio
         initial_prompt (str, opcional): Texto inicial para dar contexto
@@ -580,18 +1142,64 @@ def transcribe_audio(file_path=None, initial_prompt=None, frames=None, sample_ra
         str: Texto transcrito
     """
     transcriber = get_default_transcriber()
+    settings = (getattr(transcriber, "language", None), getattr(transcriber, "translate", None))
     
     # Se forneceu frames de áudio diretamente, processa-os
     if frames is not None and sample_rate is not None:
-        return transcriber.transcribe(frames, sample_rate)
+        frames = np.ascontiguousarray(frames)
+        key = _audio_hash(frames, frames.dtype.str, sample_rate, *settings)
+        return _cached_transcription(key, lambda: transcriber.transcribe(frames, sample_rate))
     
     # Caso contrário, transcreve um arquivo
     elif file_path is not None:
-        return transcriber.transcribe_file(file_path, initial_prompt)
+        try:
+            with open(file_path, "rb") as f:
+                file_bytes = f.read()
+        except OSError:
+            # Deixa o transcritor reportar o erro de arquivo
+            return transcriber.transcribe_file(file_path, initial_prompt)
+        key = _audio_hash(file_bytes, initial_prompt, *settings)
+        return _cached_transcription(key, lambda: transcriber.transcribe_file(file_path, initial_prompt))
     
     else:
         raise ValueError("Deve fornecer file_path OU (frames E sample_rate)")
 
+def transcribe_audio_batch(frames_list, sample_rate) -> list:
+    """
+    Transcreve vários trechos de áudio em memória usando o transcritor padrão.
+    
+    Trechos já presentes no cache são reaproveitados; os demais são enviados
+    juntos ao transcritor (transcribe_batch), quando ele processa lotes (supports_batch).
+    
+    Parâmetros:
+        frames_list (list): Lista de arrays numpy float32 com os trechos de áudio
+        sample_rate (int): Taxa de amostragem dos trechos
+        
+    Retorna:
+        list: Textos transcritos, na mesma ordem dos trechos
+    """
+    transcriber = get_default_transcriber()
+    settings = (getattr(transcriber, "language", None), getattr(transcriber, "translate", None))
+    
+    frames_list = [np.ascontiguousarray(frames) for frames in frames_list]
+    keys = [_audio_hash(frames, frames.dtype.str, sample_rate, *settings) for frames in frames_list]
+    results = [_cache_get(key) for key in keys]
+    
+    # Transcreve apenas os trechos que não estavam no cache
+    missing = [i for i, text in enumerate(results) if text is None]
+    if missing:
+        pending = [frames_list[i] for i in missing]
+        if transcriber.supports_batch:
+            texts = transcriber.transcribe_batch(pending, sample_rate)
+        else:
+            texts = [transcriber.transcribe(frames, sample_rate) for frames in pending]
+            
+        for i, text in zip(missing, texts):
+            results[i] = text
+            _cache_put(keys[i], text)
+            
+    return results
+
 def transcribe_from_recorder(recorder, output_wav=None, segment_length=None):
     """
     Transcreve áudio do gravador usando o transcritor padrão.
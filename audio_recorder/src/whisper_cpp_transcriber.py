@@ -0,0 +1,112 @@
+# whisper_cpp_transcriber.py
+# Implementação de transcrição usando o whisper.cpp (pywhispercpp) com pesos GGML quantizados
+
+import os
+import sys
+import time
+import logging
+import numpy as np
+
+# Adiciona o diretório raiz ao caminho de busca para importar constants
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from constants import (
+    WHISPER_CPP_MODEL,
+    WHISPER_CPP_THREADS
+)
+from transcription_base import AudioTranscriber, load_wav_audio, physical_cpu_count
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("WhisperCppTranscriber")
+
+class WhisperCppTranscriber(AudioTranscriber):
+    """
+    Transcritor de áudio usando o whisper.cpp através do pywhispercpp.
+
+    O modelo GGML quantizado (por exemplo "base-q8_0") é baixado na primeira execução
+    e roda na CPU com as rotinas de multiplicação de matrizes do próprio whisper.cpp,
+    sem depender do PyTorch.
+    """
+
+    def __init__(self, model_name=WHISPER_CPP_MODEL, n_threads=WHISPER_CPP_THREADS):
+        """
+        Inicializa o modelo whisper.cpp.
+
+        Parâmetros:
+            model_name (str): Nome do modelo GGML (ex.: 'base-q8_0', 'small-q5_1')
+            n_threads (int): Threads de inferência; 0 usa physical_cpu_count()
+        """
+        super().__init__()
+        from pywhispercpp.model import Model
+
+        n_threads = n_threads or physical_cpu_count()
+
+        logger.info(f"Carregando modelo whisper.cpp '{model_name}' com {n_threads} threads...")
+        start_time = time.time()
+        self.model = Model(model_name, n_threads=n_threads, print_progress=False, print_realtime=False)
+        logger.info(f"Modelo carregado em {time.time() - start_time:.2f} segundos")
+
+        self.device = "cpu"
+
+        # Configurações de transcrição
+        self.language = "pt"  # Idioma padrão Português
+        self.translate = False  # Por padrão, não traduz para inglês
+
+    def _generate(self, audio: np.ndarray, initial_prompt: str = None, final: bool = False) -> str:
+        """
+        Transcreve um array float32 mono a 16kHz.
+
+        Parâmetros:
+            audio (np.ndarray): Áudio a transcrever
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            final (bool): Ignorado; o whisper.cpp usa as mesmas opções em todos os casos
+
+        Retorna:
+            str: Texto transcrito
+        """
+        segments = self.model.transcribe(
+            np.ascontiguousarray(audio, dtype=np.float32),
+            language=self.language,
+            translate=self.translate,
+            initial_prompt=initial_prompt or ""
+        )
+        return "".join(segment.text for segment in segments).strip()
+
+    def transcribe_file(self, file_path: str, initial_prompt: str = None) -> str:
+        """
+        Transcreve um arquivo de áudio usando o whisper.cpp.
+
+        Parâmetros:
+            file_path (str): Caminho para o arquivo de áudio
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+
+        Retorna:
+            str: Texto transcrito do áudio
+        """
+        logger.info(f"Transcrevendo arquivo: {file_path}")
+
+        if not os.path.exists(file_path):
+            logger.error(f"Arquivo não encontrado: {file_path}")
+            return ""
+
+        try:
+            # WAVs PCM de 16 bits são lidos direto; outros formatos são decodificados
+            # pelo próprio pywhispercpp (via ffmpeg)
+            audio = load_wav_audio(file_path)
+
+            start_time = time.time()
+            if audio is not None:
+                text = self._generate(audio, initial_prompt)
+            else:
+                segments = self.model.transcribe(
+                    file_path,
+                    language=self.language,
+                    translate=self.translate,
+                    initial_prompt=initial_prompt or ""
+                )
+                text = "".join(segment.text for segment in segments).strip()
+            logger.info(f"Transcrição concluída em {time.time() - start_time:.2f}s. Obtidos {len(text)} caracteres.")
+            return text
+        except Exception as e:
+            logger.error(f"Erro ao transcrever arquivo {file_path}: {e}")
+            return f"[ERRO DE TRANSCRIÇÃO: {str(e)}]"
@@ -1,19 +1,39 @@
 # whisper_transcriber.py
 # Implementação específica para transcrição usando o modelo Whisper da OpenAI
 
+import os
+
+# Afinidade das threads do OpenMP/MKL: lida apenas quando o runtime é carregado (no import
+# do torch), então precisa ser definida antes; variáveis já definidas pelo usuário prevalecem
+os.environ.setdefault("OMP_PROC_BIND", "close")
+os.environ.setdefault("OMP_PLACES", "cores")
+os.environ.setdefault("MKL_DYNAMIC", "FALSE")
+
 import whisper
 import sys
-import os
 import logging
 import numpy as np
 import torch
 import time
 import threading
 import queue
-import abc
+import hashlib
+import functools
+import contextlib
+import dataclasses
+import json
 import gc  # Garbage collector
+from collections import OrderedDict
 from typing import Dict, Any, Tuple, Optional, List, Union
 
+# safetensors é opcional: carrega os pesos sem desserializar o pickle do checkpoint
+try:
+    from safetensors import safe_open
+    from safetensors.torch import save_file
+    SAFETENSORS_AVAILABLE = True
+except ImportError:
+    SAFETENSORS_AVAILABLE = False
+
 # Adiciona o diretório raiz ao caminho de busca para importar constants
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from constants import (
@@ -21,37 +41,202 @@ from constants import (
     DEVICE_TYPE, 
     SAMPLE_RATE,
     TEMPERATURE, 
-    SEGMENT_LENGTH,
+    TEMPERATURE_FALLBACK,
     LIMIT_HISTORY,
-    MAX_HISTORY_SECONDS
+    MAX_HISTORY_SECONDS,
+    ENCODER_CACHE_SIZE,
+    PROMPT_TOKEN_CACHE_SIZE,
+    TORCH_COMPILE,
+    OPTIMIZE_WEIGHTS,
+    MAX_TOKENS_PER_SECOND,
+    TORCH_CPU_THREADS,
+    SILENCE_RMS_THRESHOLD
 )
 
-# Definimos a classe base aqui ao invés de importá-la para evitar dependência circular
-class AudioTranscriber(abc.ABC):
+# Classe base única, compartilhada com os demais transcritores
+try:
+    from transcription_base import (
+        AudioTranscriber, frames_to_pcm, to_whisper_audio, load_wav_audio, tail_context, physical_cpu_count
+    )
+except ImportError:
+    from .transcription_base import (
+        AudioTranscriber, frames_to_pcm, to_whisper_audio, load_wav_audio, tail_context, physical_cpu_count
+    )
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("WhisperTranscriber")
+
+def _load_whisper_model(model_size: str, device: str):
     """
-    Classe base abstrata para transcritores de áudio.
+    Equivalente a whisper.load_model para os modelos oficiais, lendo os pesos de uma cópia
+    em safetensors ao lado do checkpoint baixado.
     
-    Qualquer novo transcritor deve herdar desta classe e implementar
-    o método transcribe_file.
+    Na primeira execução o checkpoint (.pt) é convertido; nas seguintes os pesos são lidos
+    do arquivo mapeado em memória, sem o pickle do torch.load e sem recalcular o SHA256
+    do checkpoint inteiro a cada inicialização (o whisper._download faz isso sempre).
+    Sem safetensors, ou em caso de erro, usa o whisper.load_model.
     """
+    if not SAFETENSORS_AVAILABLE or model_size not in whisper._MODELS:
+        return whisper.load_model(model_size, device=device)
+        
+    default = os.path.join(os.path.expanduser("~"), ".cache")
+    download_root = os.path.join(os.getenv("XDG_CACHE_HOME", default), "whisper")
+    url = whisper._MODELS[model_size]
+    weights_path = os.path.join(download_root, os.path.splitext(os.path.basename(url))[0] + ".safetensors")
     
-    @abc.abstractmethod
-    def transcribe_file(self, file_path: str, initial_prompt: str = None) -> str:
+    try:
+        if not os.path.exists(weights_path):
+            checkpoint_file = whisper._download(url, download_root, False)
+            checkpoint = torch.load(checkpoint_file, map_location="cpu", weights_only=True)
+            state = {k: v.contiguous() for k, v in checkpoint["model_state_dict"].items()}
+            
+            # Escreve em um arquivo temporário para não deixar uma conversão pela metade
+            partial_path = weights_path + ".tmp"
+            save_file(state, partial_path, metadata={"dims": json.dumps(checkpoint["dims"])})
+            os.replace(partial_path, weights_path)
+            logger.info(f"Pesos do modelo convertidos para {weights_path}")
+            
+        with safe_open(weights_path, framework="pt", device="cpu") as f:
+            dims = whisper.model.ModelDimensions(**json.loads(f.metadata()["dims"]))
+            state = {k: f.get_tensor(k) for k in f.keys()}
+    except Exception as e:
+        logger.warning(f"Falha ao usar os pesos em safetensors, carregando o checkpoint original: {e}")
+        return whisper.load_model(model_size, device=device)
+        
+    model = whisper.model.Whisper(dims)
+    model.load_state_dict(state)
+    model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_size])
+    return model.to(device)
+
+@functools.lru_cache(maxsize=None)
+def _mel_frontend(n_mels: int) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Janela de Hann e banco de filtros mel (em CPU), criados uma única vez por processo.
+    O whisper.log_mel_spectrogram recria a janela a cada chamada.
+    """
+    return torch.hann_window(whisper.audio.N_FFT), whisper.audio.mel_filters("cpu", n_mels)
+
+def _power_to_log_mel(power: torch.Tensor) -> torch.Tensor:
+    """Aplica ao mel de potência a mesma escala logarítmica do Whisper."""
+    log_spec = torch.clamp(power, min=1e-10).log10()
+    log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+def _log_mel_spectrogram(audio: np.ndarray, n_mels: int) -> torch.Tensor:
+    """
+    Equivalente a whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)),
+    usando a janela e o banco de filtros em cache.
+    """
+    window, filters = _mel_frontend(n_mels)
+    x = torch.from_numpy(np.ascontiguousarray(whisper.pad_or_trim(audio), dtype=np.float32))
+    stft = torch.stft(x, whisper.audio.N_FFT, whisper.audio.HOP_LENGTH, window=window, return_complex=True)
+    return _power_to_log_mel(filters @ (stft[..., :-1].abs() ** 2))
+
+# Fronteiras de palavra, a partir do final do prompt, em que _encode_prompt procura um prefixo já tokenizado
+_PROMPT_PREFIX_BOUNDARIES = 32
+
+# Chave do cache do encoder para a decodificação em andamento nesta thread (ver _encoder_cache_key)
+_encoder_key = threading.local()
+
+def _mel_digest(mel: torch.Tensor) -> Optional[bytes]:
+    """Hash do conteúdo de um mel-espectrograma em CPU; None para tensores em outro dispositivo."""
+    if mel.device.type != "cpu":
+        return None
+    return hashlib.blake2b(memoryview(mel.detach().contiguous().numpy()), digest_size=16).digest()
+
+@contextlib.contextmanager
+def _encoder_cache_key(mel: torch.Tensor):
+    """
+    Define, durante o bloco, a chave do cache do encoder a partir do mel ainda em CPU.
+    
+    O hash é calculado uma vez, antes do .to(device): sem isso o encoder teria de copiar
+    o mel da GPU para a CPU (com sincronização) só para montar a chave.
+    """
+    previous = getattr(_encoder_key, "value", None)
+    _encoder_key.value = _mel_digest(mel)
+    try:
+        yield
+    finally:
+        _encoder_key.value = previous
+
+class _RollingMelCache:
+    """
+    Mantém as colunas do mel-espectrograma da última janela para reaproveitá-las na próxima.
+    
+    Os quadros da STFT cujo suporte (N_FFT amostras) fica inteiramente dentro do áudio
+    dependem apenas dessas amostras. Quando a janela seguinte se sobrepõe à anterior e
+    avança um múltiplo de HOP_LENGTH, esses quadros são copiados e só as bordas e o
+    trecho novo passam pela STFT. O resultado é idêntico a
+    whisper.log_mel_spectrogram(whisper.pad_or_trim(audio)).
+    """
+    
+    def __init__(self, n_mels: int):
+        self.n_mels = n_mels
+        self._window, self._filters = _mel_frontend(n_mels)
+        self.reset()
+        
+    def reset(self):
+        """Descarta as colunas armazenadas."""
+        self._columns = None  # Potência mel (antes do log) dos quadros interiores
+        self._start = 0       # Posição absoluta (em amostras) do centro da primeira coluna
+        
+    def _power(self, segment: torch.Tensor) -> torch.Tensor:
+        """Potência mel dos quadros de um trecho já preenchido (sem padding implícito)."""
+        stft = torch.stft(segment, whisper.audio.N_FFT, whisper.audio.HOP_LENGTH,
+                          window=self._window, center=False, return_complex=True)
+        return self._filters @ (stft.abs() ** 2)
+        
+    def log_mel(self, audio: np.ndarray, start_sample: int) -> torch.Tensor:
         """
-        Transcreve um arquivo de áudio para texto.
+        Calcula o log-mel (n_mels, 3000) de uma janela de até 30s.
         
         Parâmetros:
-            file_path (str): Caminho para o arquivo de áudio
-            initial_prompt (str, opcional): Texto inicial para dar contexto
+            audio (np.ndarray): Janela de áudio float32 mono a 16kHz
+            start_sample (int): Posição absoluta da primeira amostra da janela no stream
             
         Retorna:
-            str: Texto transcrito
+            torch.Tensor: Log-mel espectrograma pronto para o encoder
         """
-        pass
-
-# Configurar logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger("WhisperTranscriber")
+        n_fft, hop = whisper.audio.N_FFT, whisper.audio.HOP_LENGTH
+        half = n_fft // 2
+        length = len(audio)
+        
+        # Janelas muito curtas ou que encostam no fim dos 30s usam o caminho original
+        if length < 4 * n_fft or length > whisper.audio.N_SAMPLES - n_fft:
+            self.reset()
+            return _log_mel_spectrogram(audio, self.n_mels)
+            
+        x = torch.from_numpy(np.ascontiguousarray(audio, dtype=np.float32))
+        interior_end = (length - half) // hop + 1      # Quadros com suporte todo dentro do áudio
+        touched_end = (length + half + hop - 1) // hop  # Depois deles, apenas o padding de zeros
+        
+        # Quadros reaproveitáveis da janela anterior: [2, reuse_end)
+        reuse_end = 2
+        if self._columns is not None and (self._start - start_sample) % hop == 0:
+            offset = (self._start - start_sample) // hop
+            if offset <= 2:
+                reuse_end = max(2, min(offset + self._columns.shape[1], interior_end))
+                
+        power = torch.zeros(self.n_mels, whisper.audio.N_FRAMES)
+        
+        # Dois primeiros quadros: padding reflexivo à esquerda, como no torch.stft(center=True)
+        head = torch.cat([torch.flip(x[1:half + 1], [0]), x[:hop + half]])
+        power[:, :2] = self._power(head)
+        
+        if reuse_end > 2:
+            power[:, 2:reuse_end] = self._columns[:, 2 - offset:reuse_end - offset]
+            
+        # Trecho novo até o fim do áudio, seguido dos zeros do pad_or_trim
+        tail = x[reuse_end * hop - half:]
+        needed = (touched_end - reuse_end - 1) * hop + n_fft
+        tail = torch.cat([tail, tail.new_zeros(needed - len(tail))])
+        power[:, reuse_end:touched_end] = self._power(tail)
+        
+        self._columns = power[:, 2:interior_end].clone()
+        self._start = start_sample + 2 * hop
+        
+        return _power_to_log_mel(power)
 
 class WhisperTranscriber(AudioTranscriber):
     """
@@ -59,8 +244,17 @@ class WhisperTranscriber(AudioTranscriber):
     
     Este transcritor usa o modelo Whisper localmente para converter
     áudio em texto, otimizado para arquivos WAV em 16kHz mono.
+    
+    Modelos já carregados (e já otimizados) ficam em _model_cache, indexados por
+    (tamanho, dispositivo): novas instâncias reutilizam o mesmo modelo residente.
     """
     
+    _model_cache = {}
+    _model_cache_lock = threading.Lock()
+    
+    # transcribe_batch decodifica os trechos empilhados numa única passada do modelo
+    supports_batch = True
+    
     def __init__(self, model_size=WHISPER_MODEL, device=DEVICE_TYPE):
         """
         Inicializa o transcritor Whisper com o modelo especificado.
@@ -68,9 +262,14 @@ class WhisperTranscriber(AudioTranscriber):
         Parâmetros:
             model_size (str): Tamanho do modelo Whisper a carregar
                              ('tiny', 'base', 'small', 'medium', 'large')
-            device (str): Dispositivo para inferência ('cpu' ou 'cuda')
+            device (str): Dispositivo para inferência ('auto', 'cpu' ou 'cuda')
         """
         super().__init__()
+        
+        # Em modo automático, prefere a GPU (FP16) quando houver uma disponível
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            
         logger.info(f"Inicializando WhisperTranscriber com modelo: {model_size} no dispositivo: {device}")
         
         # Define o dispositivo para CPU se CUDA não estiver disponível
@@ -81,11 +280,20 @@ class WhisperTranscriber(AudioTranscriber):
         self.device = device
         self.model_size = model_size
         
-        # Carrega o modelo Whisper (pode levar algum tempo)
-        logger.info(f"Carregando modelo Whisper {model_size} no dispositivo {device}...")
-        start_time = time.time()
-        self.model = whisper.load_model(model_size, device=device)
-        logger.info(f"Modelo carregado em {time.time() - start_time:.2f} segundos")
+        # Carrega o modelo uma única vez por (tamanho, dispositivo); construções simultâneas
+        # esperam pelo mesmo carregamento em vez de carregar o modelo duas vezes
+        with WhisperTranscriber._model_cache_lock:
+            shared = WhisperTranscriber._model_cache.get((model_size, device))
+            if shared is not None:
+                logger.info(f"Reutilizando modelo Whisper {model_size} já carregado no dispositivo {device}")
+                self.model, encoder_cache = shared
+                if encoder_cache is not None:
+                    self._encoder_cache = encoder_cache
+            else:
+                self._load_model(model_size, device)
+                WhisperTranscriber._model_cache[(model_size, device)] = (
+                    self.model, getattr(self, "_encoder_cache", None)
+                )
         
         # Configurações de transcrição
         self.language = "pt"  # Idioma padrão Português
@@ -102,8 +310,45 @@ class WhisperTranscriber(AudioTranscriber):
         # Armazena informações sobre transcrições anteriores para melhorar a continuidade
         self._transcription_history = []
         
+        # Reutiliza a tokenização do prompt de contexto, que se repete entre janelas
+        self._enable_prompt_token_cache(PROMPT_TOKEN_CACHE_SIZE)
+        
+        # Colunas do mel-espectrograma compartilhadas entre janelas sobrepostas do streaming
+        self._mel_cache = _RollingMelCache(self.model.dims.n_mels)
+        self._stream_offset = 0
+        
         # Pré-aquece o modelo com uma pequena amostra de silêncio para agilizar a primeira transcrição
-        self._warmup_model()
+        # (um modelo reutilizado do cache já foi aquecido)
+        if shared is None:
+            self._warmup_model()
+    
+    def _load_model(self, model_size: str, device: str):
+        """
+        Carrega o modelo Whisper e aplica as otimizações que alteram o próprio modelo.
+        
+        Parâmetros:
+            model_size (str): Tamanho do modelo Whisper a carregar
+            device (str): Dispositivo para inferência ('cpu' ou 'cuda')
+        """
+        if device == "cpu":
+            self._configure_cpu_threads()
+            
+        # Carrega o modelo Whisper (pode levar algum tempo)
+        logger.info(f"Carregando modelo Whisper {model_size} no dispositivo {device}...")
+        start_time = time.time()
+        self.model = _load_whisper_model(model_size, device)
+        logger.info(f"Modelo carregado em {time.time() - start_time:.2f} segundos")
+        
+        # Reduz a precisão dos pesos conforme o dispositivo (antes de compilar e de instalar os caches)
+        if OPTIMIZE_WEIGHTS:
+            self._optimize_weights()
+        
+        # Compila o encoder antes de envolvê-lo com o cache, para que o cache chame a versão compilada
+        if TORCH_COMPILE:
+            self._compile_encoder()
+        
+        # Reutiliza a saída do encoder quando o mesmo trecho de áudio é decodificado novamente
+        self._enable_encoder_cache(ENCODER_CACHE_SIZE)
     
     @staticmethod
     def is_cuda_available() -> bool:
@@ -115,12 +360,249 @@ class WhisperTranscriber(AudioTranscriber):
         """
         return torch.cuda.is_available()
     
+    def _optimize_weights(self):
+        """
+        Ajusta a precisão dos pesos do modelo ao dispositivo.
+        
+        Na GPU, as camadas lineares, convoluções e embeddings passam para FP16. O Whisper
+        decodifica com fp16=True, mas com pesos em FP32 cada camada converte o peso a cada
+        chamada; com os pesos já em FP16 essa conversão some e o tráfego de memória cai
+        pela metade. As LayerNorms continuam em FP32, como o Whisper espera.
+        
+        Na CPU, as MLPs do decoder (executadas uma vez por token) são quantizadas
+        dinamicamente em int8. As atenções ficam em FP32 para não perder qualidade; o encoder
+        também, exceto em CPUs com instruções BF16 (AMX ou AVX512-BF16), onde ele roda sob
+        autocast em BF16 e devolve a saída em FP32 para o decoder.
+        """
+        try:
+            if self.device == "cuda":
+                for module in self.model.modules():
+                    if isinstance(module, (torch.nn.Linear, torch.nn.Conv1d, torch.nn.Embedding)):
+                        module.half()
+                logger.info("Pesos do modelo convertidos para FP16")
+            else:
+                quantization = getattr(torch, "ao", torch).quantization
+                for block in self.model.decoder.blocks:
+                    # O Linear do Whisper é uma subclasse que o quantize_dynamic não reconhece;
+                    # troca por nn.Linear equivalente (em FP32 o forward é o mesmo)
+                    for i, layer in enumerate(block.mlp):
+                        if isinstance(layer, torch.nn.Linear):
+                            plain = torch.nn.Linear(layer.in_features, layer.out_features,
+                                                    bias=layer.bias is not None)
+                            plain.load_state_dict(layer.state_dict())
+                            block.mlp[i] = plain
+                    block.mlp = quantization.quantize_dynamic(block.mlp, {torch.nn.Linear}, dtype=torch.qint8)
+                logger.info("MLPs do decoder quantizadas em int8")
+                
+                if self._cpu_supports_bf16():
+                    encoder = self.model.encoder
+                    encode = encoder.forward
+                    
+                    def bf16_forward(mel):
+                        with torch.autocast(device_type="cpu", dtype=torch.bfloat16):
+                            return encode(mel).float()
+                            
+                    encoder.forward = bf16_forward
+                    logger.info("Encoder executado em BF16 (CPU com suporte a BF16)")
+        except Exception as e:
+            logger.warning(f"Falha ao otimizar os pesos do modelo, mantendo FP32: {e}")
+    
+    @staticmethod
+    def _configure_cpu_threads():
+        """
+        Limita as threads do PyTorch aos núcleos físicos (TORCH_CPU_THREADS ou
+        physical_cpu_count), e usa uma única thread inter-op (o modelo executa um grafo sequencial).
+        """
+        threads = TORCH_CPU_THREADS or physical_cpu_count()
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Só pode ser definido antes do primeiro trabalho paralelo do processo
+            pass
+        logger.info(f"PyTorch usando {threads} threads na CPU")
+    
+    @staticmethod
+    def _cpu_supports_bf16() -> bool:
+        """
+        Verifica se a CPU tem instruções de multiplicação de matrizes em BF16 (AMX ou AVX512-BF16).
+        
+        Retorna:
+            bool: True se o PyTorch detectar suporte a BF16 na CPU
+        """
+        for check in ("_is_amx_tile_supported", "_is_avx512_bf16_supported"):
+            supported = getattr(getattr(torch, "cpu", None), check, None)
+            try:
+                if supported is not None and supported():
+                    return True
+            except Exception:
+                continue
+        return False
+    
+    def _compile_encoder(self):
+        """
+        Compila o encoder do Whisper com torch.compile.
+        
+        A entrada do encoder tem forma fixa (n_mels x 3000 quadros), então o grafo é
+        especializado uma única vez; a compilação acontece no pré-aquecimento, antes da
+        primeira transcrição real. O decoder não é compilado: o comprimento da sequência
+        muda a cada token e os hooks do kv-cache forçariam recompilações.
+        """
+        if not hasattr(torch, "compile"):
+            logger.warning("torch.compile não disponível nesta versão do PyTorch")
+            return
+            
+        try:
+            # Reutiliza grafos compilados entre execuções e tolera algumas variações de forma
+            import torch._inductor.config as inductor_config
+            import torch._dynamo.config as dynamo_config
+            inductor_config.fx_graph_cache = True
+            dynamo_config.cache_size_limit = 32
+        except (ImportError, AttributeError) as e:
+            logger.debug(f"Configurações de cache do torch.compile indisponíveis: {e}")
+            
+        # "reduce-overhead" usa CUDA graphs, que só existem na GPU. Com dynamic=False cada
+        # tamanho de lote (1 a RECORDING_BATCH_SIZE) ganha um grafo especializado, em vez de
+        # o dynamo passar para um grafo de formas simbólicas na segunda forma vista
+        mode = "reduce-overhead" if self.device == "cuda" else "default"
+        encoder = self.model.encoder
+        encoder.forward = torch.compile(encoder.forward, mode=mode, dynamic=False, fullgraph=False)
+        logger.info(f"Encoder compilado com torch.compile (modo: {mode})")
+    
+    def _enable_encoder_cache(self, max_entries: int):
+        """
+        Envolve o encoder do modelo com um cache LRU indexado pelo hash do mel-espectrograma.
+        
+        O Whisper executa o encoder novamente a cada decodificação da mesma janela
+        (fallback de temperatura, janelas repetidas no streaming). Como as chaves/valores
+        de cross-attention do decoder derivam apenas da saída do encoder, reutilizá-la
+        evita o passo mais caro sem alterar o resultado.
+        
+        A chave vem de _encoder_cache_key, calculada com o mel ainda em CPU; sem ela, só
+        entradas em CPU são indexadas (na GPU o encoder roda sem cache).
+        
+        Parâmetros:
+            max_entries (int): Número máximo de saídas do encoder mantidas em memória
+        """
+        if max_entries <= 0:
+            return
+            
+        encoder = self.model.encoder
+        encode = encoder.forward
+        cache = OrderedDict()
+        lock = threading.Lock()
+        
+        def cached_forward(mel):
+            key = getattr(_encoder_key, "value", None) or _mel_digest(mel)
+            if key is None:
+                return encode(mel)
+            key += repr((tuple(mel.shape), str(mel.dtype))).encode("utf-8")
+            
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+                    
+            features = encode(mel)
+            
+            with lock:
+                cache[key] = features
+                while len(cache) > max_entries:
+                    cache.popitem(last=False)
+            return features
+            
+        encoder.forward = cached_forward
+        self._encoder_cache = cache
+    
+    def _enable_prompt_token_cache(self, max_entries: int):
+        """
+        Prepara o cache LRU dos prompts já tokenizados usado por _encode_prompt.
+        
+        A cada decodificação o Whisper tokenizaria novamente o initial_prompt, que entre
+        janelas consecutivas se repete inteiro ou cresce apenas no final. O cache é desta
+        instância: o tokenizer (e o encoding tiktoken, compartilhado pelo processo) não é
+        alterado.
+        
+        Parâmetros:
+            max_entries (int): Número máximo de textos mantidos em memória
+        """
+        self._prompt_token_cache = None
+        if max_entries <= 0:
+            return
+            
+        try:
+            self._prompt_tokenizer = whisper.tokenizer.get_tokenizer(
+                self.model.is_multilingual, num_languages=self.model.num_languages
+            )
+        except (TypeError, AttributeError):
+            # Versões antigas do whisper não recebem num_languages
+            self._prompt_tokenizer = whisper.tokenizer.get_tokenizer(self.model.is_multilingual)
+            
+        self._prompt_token_cache = OrderedDict()
+        self._prompt_token_cache_size = max_entries
+        self._prompt_token_lock = threading.Lock()
+        
+    def _encode_prompt(self, prompt: str) -> Union[str, List[int]]:
+        """
+        Tokeniza o prompt como o Whisper faria (" " + prompt.strip()), usando o cache.
+        
+        Textos idênticos são servidos direto do cache; quando um texto em cache é prefixo
+        do novo e termina numa fronteira de palavra (caractere não branco seguido de " " e
+        de outro caractere não branco), apenas o sufixo é tokenizado. Como o BPE do Whisper
+        nunca une tokens através dessa fronteira, o resultado é idêntico à tokenização
+        completa. Os prefixos são procurados pelas últimas fronteiras do texto (os prompts
+        crescem pelo final), uma consulta ao dicionário por fronteira, e não numa varredura
+        do cache.
+        
+        Args:
+            prompt: Texto do prompt
+            
+        Returns:
+            Lista de tokens para DecodingOptions.prompt; sem cache, o próprio texto
+        """
+        cache = self._prompt_token_cache
+        if cache is None:
+            return prompt
+            
+        text = " " + prompt.strip()
+        with self._prompt_token_lock:
+            tokens = cache.get(text)
+            if tokens is not None:
+                cache.move_to_end(text)
+                return list(tokens)
+                
+        prefix_tokens = None
+        end = len(text)
+        for _ in range(_PROMPT_PREFIX_BOUNDARIES):
+            end = text.rfind(" ", 1, end)
+            if end <= 1:
+                break
+            if text[end - 1].isspace() or text[end + 1].isspace():
+                continue
+            with self._prompt_token_lock:
+                prefix_tokens = cache.get(text[:end])
+            if prefix_tokens is not None:
+                break
+                
+        encode = self._prompt_tokenizer.encode
+        tokens = prefix_tokens + encode(text[end:]) if prefix_tokens is not None else encode(text)
+        
+        with self._prompt_token_lock:
+            cache[text] = tokens
+            while len(cache) > self._prompt_token_cache_size:
+                cache.popitem(last=False)
+        return list(tokens)
+    
     def _warmup_model(self):
         """Pré-aquece o modelo com uma pequena amostra de silêncio"""
         try:
             silence = np.zeros(16000, dtype=np.float32)  # 1 segundo de silêncio a 16kHz
             start_time = time.time()
-            self.model.transcribe(silence, language="pt")
+            self.model.transcribe(silence, language="pt", fp16=self.device == "cuda")
+            # Aquece também o caminho do streaming (mel incremental + decodificação gulosa
+            # sem timestamps), que usa outros kernels; o estado da janela fictícia é descartado
+            self._decode_window(silence, 0, self._optimize_options(1.0, is_segment=True))
+            self._mel_cache.reset()
             logger.info(f"Modelo pré-aquecido em {time.time() - start_time:.2f} segundos")
         except Exception as e:
             logger.warning(f"Falha ao pré-aquecer o modelo: {e}")
@@ -160,25 +642,26 @@ class WhisperTranscriber(AudioTranscriber):
                 logger.error(f"Erro ao fazer resampling: {e}")
                 
         # Verifica se o áudio não é silêncio completo
-        if np.abs(audio_array).max() > 0:
-            # Normalização de amplitude para usar o intervalo completo
-            normalized = audio_array / np.abs(audio_array).max()
-            
-            # Ajuste de volume para evitar volumes muito baixos
-            rms = np.sqrt(np.mean(normalized**2))
+        peak = np.abs(audio_array).max() if len(audio_array) else 0.0
+        if peak > 0:
+            # Normalização de amplitude (pelo pico) e ajuste de volume combinados em um único
+            # fator: o RMS do áudio normalizado é o RMS original dividido pelo pico, então
+            # o áudio é percorrido uma vez para medir e uma vez para escalar
+            rms = np.sqrt(np.dot(audio_array, audio_array) / len(audio_array)) / peak
+            gain = 1.0 / peak
             if rms < 0.05:  # Se o volume RMS for muito baixo
-                gain_factor = 0.05 / rms if rms > 0 else 1.0
-                normalized = np.clip(normalized * gain_factor, -1.0, 1.0)
+                scaled = audio_array * (gain * 0.05 / rms)
+                return np.clip(scaled, -1.0, 1.0, out=scaled)
                 
-            return normalized
+            return audio_array * gain
         return audio_array
     
     def _optimize_options(self, audio_duration: float, is_segment: bool = False) -> Dict[str, Any]:
         """
         Otimiza as opções de transcrição com base na duração do áudio.
         
-        Para segmentos mais curtos, podemos usar configurações mais leves.
-        Para segmentos mais longos, precisamos de mais qualidade.
+        Janelas do streaming usam decodificação gulosa; transcrições finais usam
+        beam search, maior para áudios mais longos.
         
         Parâmetros:
             audio_duration (float): Duração do áudio em segundos
@@ -196,44 +679,38 @@ class WhisperTranscriber(AudioTranscriber):
             "compression_ratio_threshold": 2.4,  # Valor ajustado para menos alucinações
         }
         
-        # Para streams em tempo real, otimiza para velocidade
+        # Para streams em tempo real, decodificação gulosa: cada janela é revalidada pela
+        # sobreposição com a seguinte, então o beam search custaria várias vezes mais no
+        # decoder sem ganho perceptível. Sem condicionar no texto anterior do próprio
+        # transcribe, o que evita laços de alucinação entre janelas (o contexto vem do prompt).
         if is_segment:
-            # Quanto menor o áudio, menos recursos computacionais
-            if audio_duration < 3.0:
-                options.update({
-                    "beam_size": 1,  # Sem beam search
-                    "best_of": 1,    # Sem candidatos múltiplos
-                })
-            elif audio_duration < 10.0:
-                options.update({
-                    "beam_size": 2,  # Beam search pequeno
-                    "best_of": 2     # Poucos candidatos
-                })
-            else:
-                # Para áudio mais longo, podemos usar configurações melhores
-                options.update({
-                    "beam_size": 3,
-                    "best_of": 3
-                })
-                
+            options.update({
+                "beam_size": None,  # Decodificador guloso
+                "best_of": None,
+                "condition_on_previous_text": False,
+                # O decoder gera um token por passo; sem limite, uma janela curta pode
+                # percorrer até metade do contexto (224 tokens) em laços de repetição
+                "sample_len": self._max_tokens(audio_duration),
+            })
+            return options
+            
         # Para arquivos completos (não streaming), usa configurações melhores
-        else:
-            # Prioriza qualidade sobre velocidade para arquivos longos
-            if audio_duration > 60.0:  # Mais de 1 minuto
-                options.update({
-                    "beam_size": 5,
-                    "best_of": 5
-                })
-            elif audio_duration > 20.0:  # Entre 20s e 1 minuto
-                options.update({
-                    "beam_size": 4,
-                    "best_of": 4
-                })
-            else:  # Para arquivos curtos
-                options.update({
-                    "beam_size": 3,
-                    "best_of": 3
-                })
+        # Prioriza qualidade sobre velocidade para arquivos longos
+        if audio_duration > 60.0:  # Mais de 1 minuto
+            options.update({
+                "beam_size": 5,
+                "best_of": 5
+            })
+        elif audio_duration > 20.0:  # Entre 20s e 1 minuto
+            options.update({
+                "beam_size": 4,
+                "best_of": 4
+            })
+        else:  # Para arquivos curtos
+            options.update({
+                "beam_size": 3,
+                "best_of": 3
+            })
         
         # Em CUDA, sempre podemos melhorar um pouco a qualidade
         if self.device == "cuda":
@@ -244,6 +721,16 @@ class WhisperTranscriber(AudioTranscriber):
 
         return options
 
+    def _max_tokens(self, audio_duration: float) -> int:
+        """
+        Número máximo de tokens a gerar para uma janela de audio_duration segundos.
+        
+        Proporcional à duração (MAX_TOKENS_PER_SECOND), com um mínimo para janelas muito
+        curtas e limitado à metade do contexto de texto, o máximo que o Whisper aceita.
+        """
+        limit = self.model.dims.n_text_ctx // 2
+        return max(16, min(limit, int(np.ceil(min(audio_duration, 30.0) * MAX_TOKENS_PER_SECOND))))
+    
     def _ensure_mono_audio(self, audio: np.ndarray, name: str = "audio") -> np.ndarray:
         """
         Garante que o áudio esteja no formato mono (um único canal).
@@ -332,7 +819,8 @@ class WhisperTranscriber(AudioTranscriber):
                 is_ending_with_silence = rms < silence_threshold
             
             # Processa o buffer
-            buffer, transcription = self._process_stream_buffer(self.stream_buffer)
+            stream_end = self._stream_offset + len(self.stream_buffer)
+            buffer, transcription = self._process_stream_buffer(self.stream_buffer, self._stream_offset)
             
             # Converte o texto para melhor representar pausas naturais
             if transcription:
@@ -359,6 +847,7 @@ class WhisperTranscriber(AudioTranscriber):
                 self.stream_buffer = buffer[-int(overlap):]
             else:
                 self.stream_buffer = buffer
+            self._stream_offset = stream_end - len(self.stream_buffer)
                 
             return buffer, transcription
         
@@ -378,6 +867,13 @@ class WhisperTranscriber(AudioTranscriber):
         if hasattr(self, 'accumulated_text'):
             self.accumulated_text = ""
             
+        if hasattr(self, '_encoder_cache'):
+            self._encoder_cache.clear()
+            
+        if hasattr(self, '_mel_cache'):
+            self._mel_cache.reset()
+        self._stream_offset = 0
+            
         self._last_processed = time.time()
         
         # Limpa recursos de GPU se disponível
@@ -403,67 +899,204 @@ class WhisperTranscriber(AudioTranscriber):
             return ""
             
         try:
-            # Carrega o áudio usando a função nativa do Whisper que cuida da normalização
+            # WAVs PCM de 16 bits são lidos direto, sem abrir um processo do ffmpeg;
+            # outros formatos passam pela função nativa do Whisper
             start_load = time.time()
-            audio_array = whisper.load_audio(file_path)
+            audio_array = load_wav_audio(file_path)
+            if audio_array is None:
+                audio_array = whisper.load_audio(file_path)
             logger.info(f"Áudio carregado em {time.time() - start_load:.2f}s")
             
-            # Normaliza o áudio para melhorar a qualidade da transcrição
-            audio_array = self._normalize_audio(audio_array)
-            
-            # Calcula a duração do áudio em segundos
-            audio_duration = len(audio_array) / 16000  # Whisper usa 16kHz
+            # Arquivos sem energia (mesmo limiar do gate do tempo real) não passam pelo
+            # modelo: a normalização amplificaria o ruído e o Whisper tenderia a alucinar
+            if len(audio_array) == 0 or np.sqrt(np.dot(audio_array, audio_array) / len(audio_array)) < SILENCE_RMS_THRESHOLD / 32768.0:
+                logger.info("Áudio em silêncio, transcrição ignorada")
+                return ""
             
-            # Obtém opções otimizadas com base na duração do áudio
-            options = self._optimize_options(audio_duration)
+            return self._transcribe_array(audio_array, initial_prompt)
             
-            # Cria um prompt melhorado
-            enhanced_prompt = initial_prompt
+        except Exception as e:
+            logger.error(f"Erro ao transcrever arquivo {file_path}: {e}")
+            return f"[ERRO DE TRANSCRIÇÃO: {str(e)}]"
             
-            # Se temos histórico de transcrições e um prompt inicial, enriquece o contexto
-            if initial_prompt and len(self._transcription_history) > 0:
-                # Limita o tamanho do histórico para evitar contexto muito extenso
-                recent_history = self._transcription_history[-3:]
-                # Combina o histórico com o prompt inicial
-                history_text = ' '.join(recent_history)
-                
-                # Usa o início do texto histórico seguido pelo prompt mais recente
-                # para dar contexto sem sobrecarregar o modelo
-                if len(history_text) > 200:
-                    history_text = history_text[:200] + "..."
-                    
-                enhanced_prompt = f"{history_text} {initial_prompt}"
-                logger.info(f"Prompt enriquecido criado com {len(enhanced_prompt)} caracteres")
+    def transcribe_frames(self, frames, rate: int, channels: int, sample_width: int,
+                          initial_prompt: str = None, start_sample: int = None) -> str:
+        """
+        Transcreve frames PCM em memória, sem gravar nem reler um arquivo WAV.
+        
+        Parâmetros:
+            frames: Array int16 intercalado ou lista de buffers de áudio
+            rate (int): Taxa de amostragem dos frames
+            channels (int): Número de canais
+            sample_width (int): Largura da amostra em bytes
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            start_sample (int, opcional): Posição absoluta (intercalada) dos frames na gravação;
+                                          com ela o mel-espectrograma do trecho sobreposto
+                                          à janela anterior é reaproveitado
             
-            # Adiciona o prompt ao dicionário de opções
-            if enhanced_prompt:
-                options["initial_prompt"] = enhanced_prompt
+        Retorna:
+            str: Texto transcrito do áudio
+        """
+        # Apenas PCM de 16 bits é convertido em memória
+        if sample_width != 2:
+            return super().transcribe_frames(frames, rate, channels, sample_width, initial_prompt)
             
-            # Inicia a contagem de tempo para a transcrição
-            start_time = time.time()
+        try:
+            prepared = self.prepare_frames(frames, rate, channels, sample_width, start_sample)
+        except Exception as e:
+            logger.error(f"Erro ao transcrever frames: {e}")
+            return f"[ERRO DE TRANSCRIÇÃO: {str(e)}]"
+        return self.transcribe_prepared(prepared, initial_prompt)
+        
+    def prepare_frames(self, frames, rate: int, channels: int, sample_width: int,
+                       start_sample: int = None) -> dict:
+        """
+        Converte os frames para float32 mono a 16kHz e, para janelas com posição
+        conhecida, já calcula o mel-espectrograma incremental.
+        
+        O cache de mel guarda o estado da última janela, então os segmentos de um mesmo
+        stream devem ser preparados em ordem, por uma única thread.
+        
+        Parâmetros:
+            frames: Array int16 intercalado ou lista de buffers de áudio
+            rate (int): Taxa de amostragem dos frames
+            channels (int): Número de canais
+            sample_width (int): Largura da amostra em bytes
+            start_sample (int, opcional): Posição absoluta (intercalada) dos frames na gravação
             
-            # Transcreve o áudio com o modelo Whisper
-            result = self.model.transcribe(audio_array, **options)
+        Retorna:
+            dict: Segmento preparado, a ser passado para transcribe_prepared
+        """
+        prepared = super().prepare_frames(frames, rate, channels, sample_width, start_sample)
+        if sample_width != 2:
+            return prepared
             
-            # Obtém o texto da transcrição
-            text = result.get("text", "").strip()
+        audio_array = to_whisper_audio(frames_to_pcm(frames), rate, channels)
+        
+        # Posições só são comparáveis entre janelas quando não há reamostragem
+        if start_sample is not None and rate == SAMPLE_RATE:
+            start_sample //= channels
+            # Alinha o início ao hop da STFT, condição para reaproveitar os quadros
+            skip = -start_sample % whisper.audio.HOP_LENGTH
+            audio_array = audio_array[skip:]
+            start_sample += skip
+        else:
+            start_sample = None
             
-            # Registra o tempo de processamento
-            processing_time = time.time() - start_time
-            logger.info(f"Transcrição concluída em {processing_time:.2f}s. Obtidos {len(text)} caracteres.")
+        mel = None
+        if start_sample is not None and len(audio_array) <= whisper.audio.N_SAMPLES:
+            mel = self._mel_cache.log_mel(audio_array, start_sample)
             
-            # Armazena este resultado no histórico para uso futuro
-            if text:
-                self._transcription_history.append(text)
-                # Limita o tamanho do histórico para evitar uso excessivo de memória
-                if len(self._transcription_history) > 10:
-                    self._transcription_history = self._transcription_history[-10:]
+        prepared.update(audio=audio_array, window_start=start_sample, mel=mel)
+        return prepared
+        
+    def transcribe_prepared(self, prepared: dict, initial_prompt: str = None) -> str:
+        """
+        Transcreve um segmento retornado por prepare_frames.
+        
+        Parâmetros:
+            prepared (dict): Segmento preparado
+            initial_prompt (str, opcional): Texto inicial para dar contexto
             
-            return text
+        Retorna:
+            str: Texto transcrito do áudio
+        """
+        if "audio" not in prepared:
+            return super().transcribe_prepared(prepared, initial_prompt)
             
+        try:
+            return self._transcribe_array(
+                prepared["audio"], initial_prompt, prepared["window_start"], mel=prepared["mel"]
+            )
         except Exception as e:
-            logger.error(f"Erro ao transcrever arquivo {file_path}: {e}")
+            logger.error(f"Erro ao transcrever frames: {e}")
             return f"[ERRO DE TRANSCRIÇÃO: {str(e)}]"
+            
+    def _transcribe_array(self, audio_array: np.ndarray, initial_prompt: str = None,
+                          start_sample: Optional[int] = None, mel: Optional[torch.Tensor] = None) -> str:
+        """
+        Transcreve um array float32 mono a 16kHz com as opções e o histórico de contexto
+        usados por transcribe_file e transcribe_frames.
+        
+        Parâmetros:
+            audio_array (np.ndarray): Áudio a transcrever
+            initial_prompt (str, opcional): Texto inicial para dar contexto
+            start_sample (int, opcional): Posição absoluta da janela; janelas de até 30s
+                                          são decodificadas a partir do mel incremental
+            mel (torch.Tensor, opcional): Mel-espectrograma já calculado por prepare_frames
+            
+        Retorna:
+            str: Texto transcrito do áudio
+        """
+        incremental = start_sample is not None and len(audio_array) <= whisper.audio.N_SAMPLES
+        
+        # Normaliza o áudio para melhorar a qualidade da transcrição. No caminho incremental
+        # o ganho mudaria a cada janela e invalidaria os quadros reaproveitados; o log-mel do
+        # Whisper já é relativo ao máximo da janela, então o ganho global não altera o resultado.
+        if not incremental:
+            audio_array = self._normalize_audio(audio_array)
+        
+        # Calcula a duração do áudio em segundos
+        audio_duration = len(audio_array) / 16000  # Whisper usa 16kHz
+        
+        # Obtém opções otimizadas com base na duração do áudio; janelas com posição
+        # no stream vêm da transcrição ao vivo e usam decodificação gulosa
+        options = self._optimize_options(audio_duration, is_segment=start_sample is not None)
+        
+        # Cria um prompt melhorado
+        enhanced_prompt = initial_prompt
+        
+        # Se temos histórico de transcrições e um prompt inicial, enriquece o contexto
+        if initial_prompt and len(self._transcription_history) > 0:
+            # Limita o tamanho do histórico para evitar contexto muito extenso
+            recent_history = self._transcription_history[-3:]
+            # Combina o histórico com o prompt inicial
+            history_text = ' '.join(recent_history)
+            
+            # Usa o início do texto histórico seguido pelo prompt mais recente
+            # para dar contexto sem sobrecarregar o modelo
+            if len(history_text) > 200:
+                history_text = history_text[:200] + "..."
+                
+            enhanced_prompt = f"{history_text} {initial_prompt}"
+            logger.info(f"Prompt enriquecido criado com {len(enhanced_prompt)} caracteres")
+        
+        # Adiciona o prompt ao dicionário de opções, limitado ao final (~200 tokens): o Whisper
+        # descartaria o excesso depois de tokenizá-lo, e o trecho mais recente é o prompt atual
+        if enhanced_prompt:
+            options["initial_prompt"] = tail_context(enhanced_prompt)
+        
+        # Inicia a contagem de tempo para a transcrição
+        start_time = time.time()
+        
+        # Transcreve o áudio com o modelo Whisper
+        if incremental:
+            result = self._decode_window(audio_array, start_sample, options, mel=mel)
+        elif len(audio_array) <= whisper.audio.N_SAMPLES:
+            # Um clipe de até 30s cabe numa única janela: o model.transcribe faria essa mesma
+            # decodificação, mas antes calcularia o mel de mais 30s de silêncio e montaria o
+            # laço de janelas. Sem limite extra de tokens; as novas tentativas usam o mesmo mel
+            options.setdefault("sample_len", self.model.dims.n_text_ctx // 2)
+            clip_mel = mel if mel is not None else _log_mel_spectrogram(audio_array, self.model.dims.n_mels)
+            result = self._decode_window(audio_array, 0, options, mel=clip_mel, fallback=True)
+        else:
+            result = self.model.transcribe(audio_array, **options)
+        
+        # Obtém o texto da transcrição
+        text = result.get("text", "").strip()
+        
+        # Registra o tempo de processamento
+        processing_time = time.time() - start_time
+        logger.info(f"Transcrição concluída em {processing_time:.2f}s. Obtidos {len(text)} caracteres.")
+        
+        # Armazena este resultado no histórico para uso futuro
+        if text:
+            self._transcription_history.append(text)
+            # Limita o tamanho do histórico para evitar uso excessivo de memória
+            if len(self._transcription_history) > 10:
+                self._transcription_history = self._transcription_history[-10:]
+        
+        return text
 
     def transcribe(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> str:
         """
@@ -514,6 +1147,109 @@ class WhisperTranscriber(AudioTranscriber):
             logger.error(f"Erro na transcrição: {e}")
             return f"[ERRO: {str(e)}]"
         
+    def transcribe_batch(self, audios: List[np.ndarray], sample_rate: int = SAMPLE_RATE) -> List[str]:
+        """
+        Transcreve vários trechos curtos de áudio em uma única passada do modelo.
+        
+        Os mel-espectrogramas dos trechos são empilhados em um lote (B, n_mels, 3000),
+        de forma que o encoder e o decoder processam todos de uma vez.
+        Trechos maiores que a janela de 30s do Whisper são transcritos individualmente.
+        
+        Args:
+            audios: Lista de arrays numpy float32 com os trechos de áudio
+            sample_rate: Taxa de amostragem dos trechos
+            
+        Returns:
+            Lista de textos transcritos, na mesma ordem da entrada
+        """
+        if len(audios) <= 1 or any(len(a) > whisper.audio.N_SAMPLES * sample_rate / SAMPLE_RATE for a in audios):
+            return [self.transcribe(audio, sample_rate) for audio in audios]
+            
+        try:
+            mels = []
+            for audio in audios:
+                audio = self._ensure_mono_audio(np.asarray(audio, dtype=np.float32))
+                audio = self._normalize_audio(audio, sample_rate).astype(np.float32, copy=False)
+                mels.append(_log_mel_spectrogram(audio, self.model.dims.n_mels))
+            mel = torch.stack(mels)
+            
+            options = whisper.DecodingOptions(
+                language=self.language,
+                task="translate" if self.translate else "transcribe",
+                temperature=TEMPERATURE,
+                fp16=self.device == "cuda",
+                without_timestamps=True
+            )
+            
+            start_time = time.time()
+            with _encoder_cache_key(mel):
+                results = whisper.decode(self.model, mel.to(self.model.device), options)
+            logger.info(f"Lote de {len(audios)} trechos transcrito em {time.time() - start_time:.2f} segundos")
+            
+            # Descarta trechos que o modelo considera sem fala (mesmo critério do transcribe)
+            return [
+                "" if r.no_speech_prob > 0.6 and r.avg_logprob < -1.0 else r.text.strip()
+                for r in results
+            ]
+        except Exception as e:
+            logger.error(f"Erro na transcrição em lote, transcrevendo individualmente: {e}")
+            return [self.transcribe(audio, sample_rate) for audio in audios]
+        
+    def _decode_window(self, audio: np.ndarray, start_sample: int, options: Dict[str, Any],
+                       mel: Optional[torch.Tensor] = None, fallback: bool = False) -> Dict[str, Any]:
+        """
+        Decodifica uma janela de até 30s a partir do mel-espectrograma incremental.
+        
+        Evita o model.transcribe, que recalcularia a STFT da janela inteira, inclusive
+        do trecho sobreposto já processado na chamada anterior.
+        
+        Args:
+            audio: Janela de áudio float32 mono a 16kHz
+            start_sample: Posição absoluta da janela no stream
+            options: Opções no formato do model.transcribe
+            mel: Mel-espectrograma já calculado para esta janela (ver prepare_frames)
+            fallback: Se a decodificação com temperatura 0 falhar (repetição ou baixa confiança),
+                      tenta de novo com as temperaturas de TEMPERATURE_FALLBACK, reaproveitando o mesmo mel
+            
+        Returns:
+            Dicionário com a chave "text", como o retornado pelo model.transcribe
+        """
+        if mel is None:
+            mel = self._mel_cache.log_mel(audio, start_sample)
+        # A chave do cache do encoder é calculada a partir do mel ainda em CPU
+        host_mel = mel
+        mel = mel.to(self.model.device)
+        
+        decode_options = whisper.DecodingOptions(
+            language=options.get("language", self.language),
+            task="translate" if self.translate else "transcribe",
+            temperature=0.0,
+            beam_size=options.get("beam_size"),
+            prompt=self._encode_prompt(options["initial_prompt"]) if options.get("initial_prompt") else None,
+            fp16=options.get("fp16", self.device == "cuda"),
+            sample_len=options.get("sample_len", self._max_tokens(len(audio) / SAMPLE_RATE)),
+            without_timestamps=True
+        )
+        with _encoder_cache_key(host_mel):
+            result = whisper.decode(self.model, mel, decode_options)
+        
+            # Mesmo critério de fallback do model.transcribe: repete em caso de repetição ou baixa
+            # confiança, exceto quando a janela é sem fala (no_speech alto e baixa confiança)
+            for temperature in (TEMPERATURE_FALLBACK if fallback else ()):
+                needs_fallback = (result.compression_ratio > options.get("compression_ratio_threshold", 2.4)
+                                  or result.avg_logprob < -1.0)
+                if not needs_fallback or (result.no_speech_prob > 0.6 and result.avg_logprob < -1.0):
+                    break
+                # Amostragem (temperatura > 0) usa best_of no lugar do beam search
+                result = whisper.decode(self.model, mel, dataclasses.replace(
+                    decode_options, temperature=temperature, beam_size=None, best_of=options.get("best_of")
+                ))
+        
+        # Descarta a janela se o modelo a considera sem fala (mesmo critério do transcribe)
+        if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+            return {"text": ""}
+        return {"text": result.text}
+        
     def _get_options_for_duration(self, duration: float) -> Dict:
         """
         Determina as melhores opções de transcrição com base na duração do áudio.
@@ -528,21 +1264,16 @@ class WhisperTranscriber(AudioTranscriber):
         options = {
             "language": self.language,
             "task": "translate" if self.translate else "transcribe",
-            "temperature": TEMPERATURE
+            "temperature": TEMPERATURE,
+            "fp16": self.device == "cuda"  # FP16 apenas em GPU
         }
         
         # Para áudios muito curtos, não use VAD (Voice Activity Detection)
         if duration < 5.0:
             # Configurações para áudio curto, sem segmentação
             options["temperature"] = 0  # Para determinismo máximo
-        # Para áudios de comprimento médio, use configurações padrão
-        elif duration < 30.0:
-            # Mantém configurações padrão
-            pass
-        # Para áudios longos, use segmentação para processamento em partes
-        else:
-            # Usa segmentação para áudios longos
-            options["segment_length"] = SEGMENT_LENGTH  # Tamanho do segmento em segundos
+        # Áudios médios e longos mantêm as configurações padrão: o model.transcribe já
+        # processa o áudio longo em janelas de 30s (e não aceita uma opção de segmentação)
             
         return options
         
@@ -656,7 +1387,8 @@ class WhisperTranscriber(AudioTranscriber):
             options = {
                 "language": self.language,
                 "task": "translate" if self.translate else "transcribe",
-                "temperature": 0  # Para determinismo no streaming
+                "temperature": 0,  # Para determinismo no streaming
+                "fp16": self.device == "cuda"
             }
             
             # Usa prompt inicial se tivermos texto acumulado
@@ -729,7 +1461,7 @@ class WhisperTranscriber(AudioTranscriber):
         except Exception as e:
             logger.error(f"Erro ao enviar frames para o stream: {e}")
 
-    def _process_stream_buffer(self, audio_buffer: np.ndarray) -> Tuple[np.ndarray, str]:
+    def _process_stream_buffer(self, audio_buffer: np.ndarray, start_sample: Optional[int] = None) -> Tuple[np.ndarray, str]:
         """
         Processa o buffer de stream de áudio para transcrição.
         
@@ -738,6 +1470,8 @@ class WhisperTranscriber(AudioTranscriber):
         
         Parâmetros:
             audio_buffer (np.ndarray): Buffer de áudio a ser processado
+            start_sample (int, opcional): Posição absoluta do buffer no stream, usada
+                                          para reaproveitar o mel-espectrograma da janela anterior
             
         Retorna:
             Tuple[np.ndarray, str]: Tupla com o áudio processado e a transcrição
@@ -759,6 +1493,8 @@ class WhisperTranscriber(AudioTranscriber):
         
         if len(audio_buffer) > max_samples:
             # Preserva apenas os dados mais recentes
+            if start_sample is not None:
+                start_sample += len(audio_buffer) - max_samples
             audio_buffer = audio_buffer[-max_samples:]
         
         # Garante que o áudio é contíguo na memória para processamento eficiente
@@ -786,7 +1522,11 @@ class WhisperTranscriber(AudioTranscriber):
             
             # Processa o áudio
             start_time = time.time()
-            result = self.model.transcribe(audio_buffer, **options)
+            if start_sample is not None and len(audio_buffer) <= whisper.audio.N_SAMPLES:
+                # Janela única: o mel vem do cache incremental e vai direto para o decoder
+                result = self._decode_window(audio_buffer, start_sample, options)
+            else:
+                result = self.model.transcribe(audio_buffer, **options)
             processing_time = time.time() - start_time
             
             # Log de desempenho para ajuste